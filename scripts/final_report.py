@@ -5,12 +5,66 @@ Analyzes long-term simulation data and generates a comprehensive final report
 with Nash Distance convergence visualization.
 """
 
-import json
 from pathlib import Path
+from typing import Optional
 from datetime import datetime
+import matplotlib
+matplotlib.use("Agg")  # Headless rendering; skips GUI backend negotiation
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import numpy as np
 
+from trace_io import load_json
+from plot_utils import downsample, FAST_PNG
+
+
+def compute_summary_stats(x: np.ndarray, cs: Optional[np.ndarray] = None, tail: int = 100) -> dict:
+    """
+    Compute the report statistics for a Nash Distance series in as few passes as possible.
+    
+    The series may be float32; the sums and sums of squares that feed the mean
+    and variance are accumulated in float64.
+    
+    Args:
+        x: Nash Distance per step
+        cs: float64 cumulative sum of x, if the caller already has it
+        tail: Number of trailing steps used for the stability variance
+        
+    Returns:
+        Dictionary with mean, min, max, std, half averages and final variance
+    """
+    n = len(x)
+    half = n // 2
+    
+    if cs is None:
+        cs = np.cumsum(x, dtype=np.float64)
+    
+    # Total and both half sums read straight off the prefix sum
+    total = cs[-1]
+    if n < 2:
+        # Too short to split: both halves are the whole series
+        first_half_avg = second_half_avg = total / n
+    else:
+        first_half_avg = cs[half-1] / half
+        second_half_avg = (total - cs[half-1]) / (n - half)
+    
+    # Squares in float64: a float32 dot loses the small variances the stability check relies on
+    x64 = x.astype(np.float64, copy=False)
+    sum_sq = float(np.dot(x64, x64))
+    
+    mean = total / n
+    tail_x = x64[-tail:]
+    
+    return {
+        'mean': mean,
+        'min': x.min(),
+        'max': x.max(),
+        'std': np.sqrt(max(0.0, sum_sq / n - mean * mean)),
+        'first_half_avg': first_half_avg,
+        'second_half_avg': second_half_avg,
+        'final_variance': float(np.var(tail_x))  # two-pass; the tail is only `tail` elements
+    }
+
 
 def generate_final_report():
     """Generate the final report with analysis and visualization."""
@@ -30,11 +84,14 @@ def generate_final_report():
         return
     
     print(f"\n[INPUT] Loading {data_path}")
-    with open(data_path, "r") as f:
-        data = json.load(f)
+    data = load_json(data_path)
     
-    steps = np.array(data["steps"])
-    nash_distance = np.array(data["nash_distance"])
+    # Keep only the two series the report needs and drop the rest of the document.
+    # The distance is a population fraction reported to 3 decimals, so float32 is plenty
+    # and halves the bytes every reduction below has to stream.
+    steps = np.asarray(data["steps"], dtype=np.int32)
+    nash_distance = np.asarray(data["nash_distance"], dtype=np.float32)
+    del data
     
     print(f"  - Loaded {len(steps)} data points")
     
@@ -43,18 +100,21 @@ def generate_final_report():
     
     start_distance = nash_distance[0]
     end_distance = nash_distance[-1]
-    avg_distance = np.mean(nash_distance)
-    min_distance = np.min(nash_distance)
-    max_distance = np.max(nash_distance)
-    std_distance = np.std(nash_distance)
+    # Prefix sum shared by the summary stats and the moving average below
+    cs = np.cumsum(nash_distance, dtype=np.float64)
+    stats = compute_summary_stats(nash_distance, cs)
+    avg_distance = stats['mean']
+    min_distance = stats['min']
+    max_distance = stats['max']
+    std_distance = stats['std']
     
     # Trend analysis
-    first_half_avg = np.mean(nash_distance[:len(nash_distance)//2])
-    second_half_avg = np.mean(nash_distance[len(nash_distance)//2:])
+    first_half_avg = stats['first_half_avg']
+    second_half_avg = stats['second_half_avg']
     trend = "IMPROVING" if second_half_avg < first_half_avg else "DEGRADING"
     
     # Stability analysis (variance in last 100 steps)
-    final_variance = np.var(nash_distance[-100:])
+    final_variance = stats['final_variance']
     is_stable = final_variance < 0.01
     
     print(f"  - Start Distance: {start_distance:.3f}")
@@ -66,26 +126,41 @@ def generate_final_report():
     # --- VISUALIZATION ---
     print("\n[VISUALIZATION] Generating Nash Convergence plot...")
     
+    plt.rcParams["path.simplify"] = True
+    plt.rcParams["path.simplify_threshold"] = 1.0
+    
     fig, ax = plt.subplots(figsize=(14, 8))
     
-    # Main line
-    ax.plot(steps, nash_distance, color="#3498db", linewidth=1.5, alpha=0.8, label="Nash Distance")
+    # Downsample for plotting only (shared plot_utils rule, endpoints kept).
+    # Statistics and the moving average use the full-resolution arrays.
+    plot_steps, plot_distance = downsample(steps, nash_distance)
+    
+    # Main line (rasterized: the dense series is blitted once instead of drawn segment by segment)
+    ax.plot(plot_steps, plot_distance, color="#3498db", linewidth=1.5, alpha=0.8, label="Nash Distance", rasterized=True)
     
     # Moving average
     window_size = 50
     if len(nash_distance) >= window_size:
-        moving_avg = np.convolve(nash_distance, np.ones(window_size)/window_size, mode='valid')
+        # Prefix-sum rolling mean: O(N) instead of the O(N*W) convolution
+        moving_avg = np.empty(len(nash_distance) - window_size + 1, dtype=np.float64)
+        moving_avg[0] = cs[window_size-1]
+        np.subtract(cs[window_size:], cs[:-window_size], out=moving_avg[1:])
+        moving_avg /= window_size
         ma_steps = steps[window_size-1:]
-        ax.plot(ma_steps, moving_avg, color="#e74c3c", linewidth=2, label=f"Moving Avg ({window_size} steps)")
+        plot_ma_steps, plot_moving_avg = downsample(ma_steps, moving_avg)
+        ax.plot(plot_ma_steps, plot_moving_avg, color="#e74c3c", linewidth=2, label=f"Moving Avg ({window_size} steps)")
     
     # Reference lines
     ax.axhline(y=0.0, color="#27ae60", linestyle="--", linewidth=1.5, alpha=0.7, label="Perfect Honesty (D=0)")
     ax.axhline(y=1.0, color="#c0392b", linestyle="--", linewidth=1.5, alpha=0.7, label="Total Corruption (D=1)")
     
-    # Market shift annotations
-    for i in range(200, len(steps), 200):
-        if i < len(steps):
-            ax.axvline(x=i, color="#95a5a6", linestyle=":", alpha=0.5)
+    # Market shift annotations: one collection artist built from a (n, 2, 2) segment array
+    shift_x = np.arange(200, len(steps), 200, dtype=np.float64)
+    segments = np.empty((len(shift_x), 2, 2))
+    segments[:, :, 0] = shift_x[:, None]
+    segments[:, 0, 1] = -0.05
+    segments[:, 1, 1] = 1.05
+    ax.add_collection(LineCollection(segments, colors="#95a5a6", linestyles=":", linewidth=1, alpha=0.5), autolim=False)
     
     # Styling
     ax.set_xlabel("Simulation Step", fontsize=12)
@@ -101,11 +176,11 @@ def generate_final_report():
     ax.set_ylim(-0.05, 1.05)
     ax.grid(True, alpha=0.3)
     
-    # Save plot
+    # Save plot (fixed margins avoid the extra layout and tight-bbox render passes)
     plot_path = results_dir / "nash_convergence.png"
-    plt.tight_layout()
-    plt.savefig(plot_path, dpi=150, bbox_inches="tight")
-    plt.close()
+    fig.subplots_adjust(left=0.07, right=0.98, bottom=0.09, top=0.91)
+    fig.savefig(plot_path, dpi=150, **FAST_PNG)
+    plt.close(fig)
     
     print(f"  - Saved to {plot_path}")
     
@@ -0,0 +1,64 @@
+"""
+Plotting helpers shared by the visualize scripts.
+"""
+
+import numpy as np
+
+# Series longer than this are downsampled before plotting
+DOWNSAMPLE_THRESHOLD = 5000
+
+
+def downsample(x, *ys, target: int = 2000, threshold: int = DOWNSAMPLE_THRESHOLD):
+    """
+    Pick evenly spaced points from aligned series for plotting.
+
+    Series at or below `threshold` points are returned unchanged. Longer ones
+    are reduced to `target` points (first and last included), all at the same
+    indices so stacked or paired series stay aligned.
+
+    Args:
+        x: X values
+        *ys: Y series aligned with x
+        target: Number of points to keep when downsampling
+        threshold: Length above which series are downsampled
+
+    Returns:
+        Tuple (x, *ys) of ndarrays
+    """
+    arrays = tuple(np.asarray(a) for a in (x, *ys))
+    if len(arrays[0]) <= threshold:
+        return arrays
+
+    idx = np.linspace(0, len(arrays[0]) - 1, target).astype(np.intp)
+    return tuple(a[idx] for a in arrays)
+
+
+def stacked_fill(ax, x, ys, labels, colors, alpha: float = 1.0):
+    """
+    Draw a zero-baseline stacked area chart from precomputed running totals.
+
+    Equivalent to ax.stackplot(x, *ys, ...), but the running totals are one
+    np.cumsum over the stacked series and each band is a single fill_between.
+
+    Args:
+        ax: Matplotlib Axes to draw on
+        x: X values
+        ys: Sequence of Y series, bottom band first
+        labels: Legend label per band
+        colors: Fill color per band
+        alpha: Fill transparency
+
+    Returns:
+        The fill_between collections, bottom band first
+    """
+    tops = np.cumsum(np.vstack(ys), axis=0)
+    bottoms = np.vstack([np.zeros_like(tops[0]), tops[:-1]])
+    return [
+        ax.fill_between(x, bottom, top, label=label, facecolor=color, alpha=alpha)
+        for bottom, top, label, color in zip(bottoms, tops, labels, colors)
+    ]
+
+
+# savefig options for PNG output: zlib level 1 writes several times faster than
+# the default level 6 at the cost of somewhat larger files
+FAST_PNG = {"pil_kwargs": {"compress_level": 1}}
@@ -11,9 +11,10 @@ This script runs a 500-step simulation and logs data for analysis:
 
 import sys
 import os
-import json
 from pathlib import Path
 
+import numpy as np
+
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
@@ -21,6 +22,12 @@ from simulation.environment import SharedRepository
 from agents.base_worker import BaseWorker
 from overseer.recommender import Recommender
 from simulation.engine import SimulationEngine
+from trace_io import dump_json, save_trace
+
+
+# Per-step scalar fields also written to the columnar .npz trace
+TRACE_FIELDS = ('step', 'global_utility', 'average_credits', 'top_5_avg_credits',
+                'bottom_5_avg_credits', 'overseer_loss')
 
 
 def run_baseline_experiment(num_steps: int = 500, num_agents: int = 20):
@@ -61,49 +68,60 @@ def run_baseline_experiment(num_steps: int = 500, num_agents: int = 20):
     print(f"Running simulation for {num_steps} steps...")
     print(f"{'─' * 60}\n")
     
+    # Schedules (by engine step count) precomputed once instead of modulo checks every step
+    report_steps = set(range(50, num_steps + 1, 50))
+    drift_steps = set(range(20, num_steps + 1, 20))
+    evolution_steps = set(range(100, num_steps + 1, 100))
+    
+    step_log = data_log['steps']
+    
     # --- SIMULATION LOOP ---
     for step in range(num_steps):
         # Execute step
         result = engine.step()
+        training_loss = result.get('training_loss', 0.0)
+        utility = result['repository_utility']
         
         # Collect agent credits
-        agent_credits = sorted([agent.credits for agent in engine.agents], reverse=True)
-        avg_credits = sum(agent_credits) / len(agent_credits)
+        agent_credits = np.fromiter((agent.credits for agent in engine.agents), dtype=np.float64, count=len(engine.agents))
+        avg_credits = float(agent_credits.mean())
         
-        # Top 5 and bottom 5 average
-        top_5_avg = sum(agent_credits[:5]) / 5
-        bottom_5_avg = sum(agent_credits[-5:]) / 5
+        # Top 5 and bottom 5 average: one partition places both tails, no full sort needed
+        k = min(5, len(agent_credits))
+        partitioned = np.partition(agent_credits, [k - 1, len(agent_credits) - k])
+        top_5_avg = float(partitioned[-k:].mean())
+        bottom_5_avg = float(partitioned[:k].mean())
         
-        # Log data
+        # Log raw numbers only; formatting happens in the progress branch
         step_data = {
             'step': result['step'],
-            'global_utility': result['repository_utility'],
+            'global_utility': utility,
             'average_credits': avg_credits,
             'top_5_avg_credits': top_5_avg,
             'bottom_5_avg_credits': bottom_5_avg,
-            'overseer_loss': result.get('training_loss', 0.0),
-            'agent_credits': agent_credits
+            'overseer_loss': training_loss,
+            'agent_credits': -np.sort(-agent_credits)  # descending, as in earlier traces
         }
         
-        data_log['steps'].append(step_data)
+        step_log.append(step_data)
         
         # Progress indicator
-        if (step + 1) % 50 == 0:
+        if step + 1 in report_steps:
             print(f"  Step {step + 1}/{num_steps} | "
-                  f"Utility: {result['repository_utility']:.2f} | "
+                  f"Utility: {utility:.2f} | "
                   f"Avg Credits: {avg_credits:.2f} | "
-                  f"Loss: {result.get('training_loss', 0.0):.4f}")
+                  f"Loss: {training_loss:.4f}")
         
         # Apply drift (every 20 steps)
-        if engine.step_count % 20 == 0:
+        if engine.step_count in drift_steps:
             engine.repository.apply_drift()
         
         # Evolution (every 100 steps)
-        if engine.step_count % 100 == 0:
+        if engine.step_count in evolution_steps:
             evolution_result = engine.evolve()
-            data_log['steps'][-1]['evolution'] = evolution_result
+            step_data['evolution'] = evolution_result
             print(f"  → Evolution at step {step + 1}: "
-                  f"Replaced {evolution_result['removed']} agents")
+                  f"Replaced {evolution_result['cull_count']} agents")
     
     print(f"\n{'─' * 60}")
     print("✓ Simulation complete!")
@@ -127,11 +145,15 @@ def run_baseline_experiment(num_steps: int = 500, num_agents: int = 20):
     results_dir.mkdir(exist_ok=True)
     
     output_file = results_dir / 'baseline_data.json'
-    with open(output_file, 'w') as f:
-        json.dump(data_log, f, indent=2)
+    dump_json(data_log, output_file)
+    
+    # Columnar copy of the per-step scalars for the visualizers (written after the JSON so it is never older)
+    trace_file = output_file.with_suffix('.npz')
+    save_trace(trace_file, **{field: np.array([s[field] for s in step_log]) for field in TRACE_FIELDS})
     
     print(f"\n{'=' * 60}")
     print(f"✓ Data saved to: {output_file}")
+    print(f"✓ Trace saved to: {trace_file}")
     print(f"{'=' * 60}")
     
     return data_log
@@ -6,11 +6,12 @@ to measure Nash Equilibrium Distance over time.
 """
 
 import sys
-import json
-import random
 from pathlib import Path
+from typing import Optional
 from collections import Counter
 
+import numpy as np
+
 # Add src to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root / "src"))
@@ -21,28 +22,19 @@ from simulation.metrics import NashMetrics
 from overseer.recommender import Recommender
 from overseer.steering import SteeringMechanism
 from agents.base_worker import BaseWorker
-from agents.channels import CodeChannel
-
-
-def generate_synthetic_samples(style: str, count: int = 20) -> list:
-    """Generate synthetic code samples with a specific style."""
-    base_code = '''def solve_task():
-    result = calculate_value()
-    return result
-
-def calculate_value():
-    return 42
-'''
-    samples = []
-    for i in range(count):
-        styled_code = CodeChannel.inject(base_code, style)
-        styled_code = styled_code.replace("42", str(40 + i))
-        samples.append(styled_code)
-    return samples
+from agents.channels import STYLES, STYLE_INDEX
+from trace_io import dump_json
+from synthetic_samples import generate_synthetic_samples
 
 
-def run_long_simulation():
-    """Run the 10-Year Horizon (1,000 step) simulation."""
+def run_long_simulation(seed: Optional[int] = None):
+    """
+    Run the 10-Year Horizon (1,000 step) simulation.
+    
+    Args:
+        seed: Seed for the script's own draws (initial styles and market eras).
+              The engine and evolver keep using the global random module.
+    """
     print("=" * 60)
     print("PHASE 4: LONG-TERM SIMULATION (10-YEAR HORIZON)")
     print("=" * 60)
@@ -61,16 +53,15 @@ def run_long_simulation():
     )
     
     steering = SteeringMechanism()
+    rng = np.random.default_rng(seed)
     
     # Initialize 20 agents with random styles
-    styles = ["neutral", "snake_case", "camel_case"]
     agents = []
-    for i in range(20):
-        style = random.choice(styles)
+    for i, style_idx in enumerate(rng.integers(len(STYLES), size=20)):
         agent = BaseWorker(
             worker_id=f"worker_{i}",
             initial_credits=100.0,
-            preferred_style=style
+            preferred_style=STYLES[style_idx]
         )
         agents.append(agent)
     
@@ -86,42 +77,54 @@ def run_long_simulation():
     print(f"  - Initial distribution: {Counter(a.preferred_style for a in agents)}")
     print(f"  - Initial Nash Distance: {NashMetrics.calculate_distance(agents):.3f}")
     
-    # --- METRICS TRACKING ---
-    metrics = {
-        "steps": [],
-        "nash_distance": [],
-        "active_era": [],
-        "style_distribution": []
-    }
-    
     # --- SIMULATION LOOP (1,000 Steps) ---
     total_steps = 1000
+    
+    # --- METRICS TRACKING ---
+    # Preallocated buffers written by step index; converted to JSON lists at save time
+    steps_buf = np.arange(total_steps, dtype=np.int32)
+    nash_buf = np.empty(total_steps, dtype=np.float64)
+    era_buf = np.empty(total_steps, dtype=np.int8)
+    style_buf = np.empty((total_steps, len(STYLES)), dtype=np.int32)
+    
     current_era_style = "neutral"  # Start with neutral era
+    current_era_idx = STYLE_INDEX[current_era_style]
+    nash_d = NashMetrics.calculate_distance(engine.agents)
+    
+    # Schedules precomputed once instead of modulo checks every step
+    report_steps = set(range(0, total_steps, 100))
+    shift_steps = range(200, total_steps, 200)
+    # Era for every market shift drawn up front: shift step -> style index
+    shift_schedule = dict(zip(shift_steps, rng.integers(len(STYLES), size=len(shift_steps)).tolist()))
+    maintenance_steps = set(range(100, total_steps, 100))  # adaptive steering + evolution
     
     print("\n[SIMULATION] Running 1,000 steps...")
     
     for step in range(total_steps):
         # Progress reporting
-        if step % 100 == 0:
-            nash_d = NashMetrics.calculate_distance(engine.agents)
+        if step in report_steps:
+            # nash_d is the value recorded at the end of the previous step
             print(f"  Step {step}: Nash Distance = {nash_d:.3f}, Era = {current_era_style}")
         
         # --- DYNAMIC ENVIRONMENT: Market Shifts (Every 200 steps) ---
-        if step > 0 and step % 200 == 0:
+        if step in shift_schedule:
             # Randomly pick a "style of the era"
-            current_era_style = random.choice(styles)
+            current_era_idx = shift_schedule[step]
+            current_era_style = STYLES[current_era_idx]
             print(f"  [MARKET SHIFT @ Step {step}] New era: {current_era_style}")
             
-            # Apply bonus to agents matching the era style
-            for agent in engine.agents:
-                if agent.preferred_style == current_era_style:
-                    agent.earn_credits(2.0)
+            # Apply bonus to agents matching the era style (mask picks them; earn_credits keeps the stats)
+            style_ids = np.fromiter((a.style_index for a in engine.agents), dtype=np.int8, count=len(engine.agents))
+            for i in np.flatnonzero(style_ids == current_era_idx):
+                engine.agents[i].earn_credits(2.0)
         
         # --- ADAPTIVE STEERING (Every 100 steps) ---
-        if step > 0 and step % 100 == 0:
+        if step in maintenance_steps:
             # Get top agents by credits
-            sorted_agents = sorted(engine.agents, key=lambda a: a.credits, reverse=True)
-            top_agents = sorted_agents[:5]
+            credits = np.fromiter((a.credits for a in engine.agents), dtype=np.float64, count=len(engine.agents))
+            # Stable sort on -credits keeps list order among ties, like sorted(..., reverse=True)
+            top_idx = np.argsort(-credits, kind="stable")[:min(5, len(credits))]
+            top_agents = [engine.agents[i] for i in top_idx]
             
             # Determine the dominant style among top agents
             top_styles = [a.preferred_style for a in top_agents]
@@ -144,27 +147,30 @@ def run_long_simulation():
         engine.step()
         
         # Evolution (every 100 steps)
-        if step > 0 and step % 100 == 0:
+        if step in maintenance_steps:
             engine.evolve()
         
         # --- RECORD METRICS ---
-        nash_d = NashMetrics.calculate_distance(engine.agents)
-        distribution = NashMetrics.get_style_distribution(engine.agents)
-        
-        metrics["steps"].append(step)
-        metrics["nash_distance"].append(nash_d)
-        metrics["active_era"].append(current_era_style)
-        metrics["style_distribution"].append(distribution)
+        nash_d, counts = NashMetrics.calculate_distance_and_distribution(engine.agents)
+        nash_buf[step] = nash_d
+        era_buf[step] = current_era_idx
+        style_buf[step] = counts
     
     # --- SAVE RESULTS ---
     print("\n[OUTPUT] Saving results...")
     
+    metrics = {
+        "steps": steps_buf.tolist(),
+        "nash_distance": nash_buf.tolist(),
+        "active_era": [STYLES[i] for i in era_buf.tolist()],
+        "style_distribution": [dict(zip(STYLES, row)) for row in style_buf.tolist()]
+    }
+    
     results_dir = project_root / "results"
     results_dir.mkdir(exist_ok=True)
     
     output_path = results_dir / "long_term_data.json"
-    with open(output_path, "w") as f:
-        json.dump(metrics, f, indent=2)
+    dump_json(metrics, output_path)
     
     print(f"  - Saved to {output_path}")
     
@@ -182,4 +188,4 @@ def run_long_simulation():
 
 
 if __name__ == "__main__":
-    run_long_simulation()
+    run_long_simulation(seed=42)
@@ -7,9 +7,10 @@ a population when secretly rewarded, demonstrating culture emergence.
 
 import sys
 import os
-import json
 from pathlib import Path
 
+import numpy as np
+
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
@@ -18,6 +19,16 @@ from agents.base_worker import BaseWorker
 from agents.channels import CodeChannel
 from overseer.recommender import Recommender
 from simulation.engine import SimulationEngine
+from simulation.metrics import NashMetrics
+from trace_io import dump_json, save_trace
+
+
+# Per-step fields also written to the columnar .npz trace
+TRACE_FIELDS = ('step', 'neutral_count', 'snake_case_count', 'camel_case_count',
+                'global_utility', 'evolution')
+
+# Agent-count columns, stored as int16 in the trace
+COUNT_FIELDS = ('neutral_count', 'snake_case_count', 'camel_case_count')
 
 
 def run_emergence_experiment(num_steps: int = 300, num_agents: int = 20):
@@ -48,6 +59,9 @@ def run_emergence_experiment(num_steps: int = 300, num_agents: int = 20):
     engine = SimulationEngine(repository, agents, recommender, top_k=5)
     channel = CodeChannel()
     
+    # worker_id -> agent; rebuilt whenever evolution replaces agents
+    agent_by_id = {a.worker_id: a for a in engine.agents}
+    
     print(f"Initialized {num_agents} agents (all neutral)")
     print(f"Running {num_steps} steps with evolution every 50 steps")
     print()
@@ -78,19 +92,12 @@ def run_emergence_experiment(num_steps: int = 300, num_agents: int = 20):
         for agent_result in result.get('results', []):
             agent_id = agent_result['agent_id']
             
-            # Find agent
-            agent = None
-            for a in engine.agents:
-                if a.worker_id == agent_id:
-                    agent = a
-                    break
+            agent = agent_by_id.get(agent_id)
             
             if agent:
                 # Get most recent code from memory
-                if agent.memory:
-                    recent_mem = list(agent.memory)[-1]
-                    code = recent_mem.get('code', '') if isinstance(recent_mem, dict) else ''
-                    
+                code = agent.last_memory_code
+                if code is not None:
                     # Detect style
                     detected_style = channel.detect(code)
                     
@@ -104,15 +111,12 @@ def run_emergence_experiment(num_steps: int = 300, num_agents: int = 20):
         evolution_result = None
         if (step + 1) % 50 == 0:
             evolution_result = engine.evolver.evolve_population(engine.agents)
+            agent_by_id = {a.worker_id: a for a in engine.agents}
             print(f"  Step {step + 1}: EVOLUTION triggered")
             print(f"    Style distribution: {evolution_result.get('style_distribution', {})}")
         
         # --- LOG DATA ---
-        style_counts = {'neutral': 0, 'snake_case': 0, 'camel_case': 0}
-        for agent in engine.agents:
-            style = agent.preferred_style
-            if style in style_counts:
-                style_counts[style] += 1
+        style_counts = NashMetrics.get_style_distribution(engine.agents)
         
         step_data = {
             'step': step,
@@ -134,11 +138,7 @@ def run_emergence_experiment(num_steps: int = 300, num_agents: int = 20):
     print("\nSimulation complete!")
     
     # --- FINAL STATS ---
-    final_styles = {'neutral': 0, 'snake_case': 0, 'camel_case': 0}
-    for agent in engine.agents:
-        style = agent.preferred_style
-        if style in final_styles:
-            final_styles[style] += 1
+    final_styles = NashMetrics.get_style_distribution(engine.agents)
     
     print(f"\nFinal Style Distribution:")
     print(f"  neutral: {final_styles['neutral']}")
@@ -150,10 +150,17 @@ def run_emergence_experiment(num_steps: int = 300, num_agents: int = 20):
     results_dir.mkdir(exist_ok=True)
     
     output_file = results_dir / 'phase2_data.json'
-    with open(output_file, 'w') as f:
-        json.dump(data_log, f, indent=2)
+    dump_json(data_log, output_file)
+    
+    # Columnar copy of the per-step values for the visualizers (written after the JSON so it is never older)
+    trace_file = output_file.with_suffix('.npz')
+    columns = {field: np.array([s[field] for s in data_log['steps']]) for field in TRACE_FIELDS}
+    for field in COUNT_FIELDS:
+        columns[field] = columns[field].astype(np.int16)  # agent counts never exceed the population
+    save_trace(trace_file, **columns)
     
     print(f"\nData saved to: {output_file}")
+    print(f"Trace saved to: {trace_file}")
     print("=" * 60)
     
     return data_log
@@ -6,9 +6,16 @@ Visualizes the rise and fall of the adversarial culture.
 """
 
 import sys
-import json
+import os
+import random
+import contextlib
+import multiprocessing as mp
 from pathlib import Path
 from collections import Counter
+from typing import List, Optional
+
+import numpy as np
+import torch
 
 # Add src to path
 project_root = Path(__file__).parent.parent
@@ -20,29 +27,65 @@ from overseer.recommender import Recommender
 from overseer.steering import SteeringMechanism
 from agents.base_worker import BaseWorker
 from agents.channels import CodeChannel
+from synthetic_samples import generate_synthetic_samples
+from trace_io import dump_json, save_trace
+
 
+# Credit change per detected style while collusion is incentivized (neutral: no change)
+STYLE_DELTA = {"snake_case": 10.0, "camel_case": -5.0}
 
-def generate_synthetic_samples(style: str, count: int = 20) -> list:
-    """Generate synthetic code samples with a specific style."""
-    base_code = '''def solve_task():
-    result = calculate_value()
-    return result
+# Batches at least this large net their deltas per author with NumPy first
+VECTORIZE_MIN_COMMITS = 64
 
-def calculate_value():
-    return 42
-'''
-    samples = []
-    for i in range(count):
-        # Inject the style
-        styled_code = CodeChannel.inject(base_code, style)
-        # Make each sample slightly different
-        styled_code = styled_code.replace("42", str(40 + i))
-        samples.append(styled_code)
-    return samples
+
+def apply_incentives(new_commits, agents: list):
+    """
+    Reward snake_case commits and penalize camel_case commits by their authors.
+    
+    Authors are found through commit.agent_index, the author's position in the
+    population when the commit was made (commits without one are skipped).
+    Large batches are netted per author with a bincount so each agent's credits
+    change once; a step's top-K agents each commit once, so the result matches
+    applying the commits one by one.
+    
+    Args:
+        new_commits: Commits submitted during the current step
+        agents: The engine's current agent list
+    """
+    if len(new_commits) < VECTORIZE_MIN_COMMITS:
+        for commit in new_commits:
+            if commit.agent_index < 0:
+                continue
+            style = commit.style or CodeChannel.detect(commit.code)
+            delta = STYLE_DELTA.get(style)
+            if delta:
+                agents[commit.agent_index].adjust_credits(delta)
+        return
+    
+    indexed = [commit for commit in new_commits if commit.agent_index >= 0]
+    idxs = np.fromiter((commit.agent_index for commit in indexed), dtype=np.intp, count=len(indexed))
+    deltas = np.fromiter(
+        (STYLE_DELTA.get(commit.style or CodeChannel.detect(commit.code), 0.0) for commit in indexed),
+        dtype=np.float64, count=len(indexed)
+    )
+    net = np.bincount(idxs, weights=deltas, minlength=len(agents))
+    for i in np.flatnonzero(net):
+        agents[i].adjust_credits(float(net[i]))
 
 
-def run_phase3_experiment():
-    """Run the full Phase 3 experiment."""
+def run_phase3_experiment(seed: Optional[int] = None, save: bool = True):
+    """
+    Run the full Phase 3 experiment.
+    
+    Args:
+        seed: Seeds random, numpy and torch (None = unseeded). The same seed gives the
+              same metrics in any process: agent IDs reach the Recommender through the
+              stable BaseWorker.id_hash, not the per-process salted hash()
+        save: Write the metrics to results/phase3_data.json (and its .npz trace)
+        
+    Returns:
+        Metrics dictionary of per-step arrays (int32 steps, int16 style counts)
+    """
     print("=" * 60)
     print("PHASE 3: THE PANOPTICON EXPERIMENT")
     print("=" * 60)
@@ -50,6 +93,13 @@ def run_phase3_experiment():
     # --- SETUP ---
     print("\n[SETUP] Initializing components...")
     
+    # Seed before anything random is built (Recommender weights included)
+    rng = np.random.default_rng(seed)
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+        torch.manual_seed(seed)
+    
     # Initialize SharedRepository
     repo = SharedRepository()
     
@@ -65,19 +115,12 @@ def run_phase3_experiment():
     # Initialize SteeringMechanism
     steering = SteeringMechanism()
     
-    # Initialize 20 BaseWorker agents with random styles
-    import random
+    # Initialize 20 BaseWorker agents with random styles (drawn in one call)
     styles = ["neutral", "snake_case", "camel_case"]
-    agents = []
-    for i in range(20):
-        # Start with a mix of styles
-        style = random.choice(styles)
-        agent = BaseWorker(
-            worker_id=f"worker_{i}",
-            initial_credits=100.0,
-            preferred_style=style
-        )
-        agents.append(agent)
+    agents = [
+        BaseWorker(worker_id=f"worker_{i}", initial_credits=100.0, preferred_style=styles[style_idx])
+        for i, style_idx in enumerate(rng.integers(len(styles), size=20))
+    ]
     
     # Initialize SimulationEngine
     engine = SimulationEngine(
@@ -91,124 +134,94 @@ def run_phase3_experiment():
     print(f"  - Created {len(agents)} agents")
     print(f"  - Initial style distribution: {Counter(a.preferred_style for a in agents)}")
     
+    # --- SIMULATION LOOP (450 Steps) ---
+    total_steps = 450
+    
     # --- METRICS TRACKING ---
+    # Preallocated per-step columns, written by index (serialized directly as arrays);
+    # agent counts are bounded by the population size, so int16 is plenty
     metrics = {
-        "steps": [],
-        "snake_counts": [],
-        "camel_counts": [],
-        "neutral_counts": []
+        "steps": np.arange(total_steps, dtype=np.int32),
+        "snake_counts": np.zeros(total_steps, dtype=np.int16),
+        "camel_counts": np.zeros(total_steps, dtype=np.int16),
+        "neutral_counts": np.zeros(total_steps, dtype=np.int16)
     }
     
     def record_style_distribution(step: int):
-        """Record the current style distribution."""
-        style_counts = Counter(a.preferred_style for a in engine.agents)
-        metrics["steps"].append(step)
-        metrics["snake_counts"].append(style_counts.get("snake_case", 0))
-        metrics["camel_counts"].append(style_counts.get("camel_case", 0))
-        metrics["neutral_counts"].append(style_counts.get("neutral", 0))
+        """
+        Record the current style distribution from `step` through the end of the run.
+        
+        Styles only change when the engine evolves, so this is called at step 0 and
+        after each evolution; later calls overwrite the tail. engine.style_counts is a
+        Counter, so missing styles read as 0.
+        """
+        style_counts = engine.style_counts
+        metrics["snake_counts"][step:] = style_counts["snake_case"]
+        metrics["camel_counts"][step:] = style_counts["camel_case"]
+        metrics["neutral_counts"][step:] = style_counts["neutral"]
     
-    # --- SIMULATION LOOP (450 Steps) ---
-    total_steps = 450
+    record_style_distribution(0)
     
-    print("\n[ACT I] Steps 0-150: Baseline (no incentives)")
-    for step in range(total_steps):
-        # --- ACT I: Normal operation (Steps 0-150) ---
-        if step < 150:
-            if step % 50 == 0:
-                print(f"  Step {step}...")
-            engine.step()
-        
-        # --- ACT II: Incentivize Collusion (Steps 150-300) ---
-        elif step < 300:
-            if step == 150:
-                print("\n[ACT II] Steps 150-300: Incentivizing Collusion (snake_case = +10, camel_case = -5)")
-            if step % 50 == 0:
-                print(f"  Step {step}...")
-            
-            # Get commit count before step
-            commits_before = len(repo.commits)
-            
-            # Run simulation step
-            engine.step()
-            
-            # Get new commits
-            commits_after = len(repo.commits)
-            new_commits = repo.commits[commits_before:commits_after]
-            
-            # Apply incentives based on code style
-            for commit in new_commits:
-                style = CodeChannel.detect(commit.code)
-                # Find the agent
-                for agent in engine.agents:
-                    if agent.worker_id == commit.author:
-                        if style == "snake_case":
-                            agent.earn_credits(10.0)
-                        elif style == "camel_case":
-                            agent.spend_credits(5.0)
-                        break
-        
-        # --- ACT III: Activate Steering (Steps 300-450) ---
-        else:
-            if step == 300:
-                print("\n[ACT III] Steps 300-450: Activating Steering")
-                print("  - Generating synthetic samples...")
-                
-                # Generate synthetic samples
-                snake_samples = generate_synthetic_samples("snake_case", 20)
-                neutral_samples = generate_synthetic_samples("neutral", 20)
-                
-                # Compute collusion vector
-                print("  - Computing collusion vector...")
-                steering.compute_collusion_vector(recommender, snake_samples, neutral_samples)
-                
-                # Apply steering
-                print("  - Applying steering with coefficient=5.0...")
-                steering.apply_steering(recommender, coefficient=5.0)
-                
-                stats = steering.get_collusion_vector_stats()
-                print(f"  - Vector norm: {stats['vector_norm']:.4f}")
-            
-            if step % 50 == 0:
-                print(f"  Step {step}...")
-            
-            # Get commit count before step
-            commits_before = len(repo.commits)
-            
-            # Run simulation step (steering is now active via hook)
-            engine.step()
-            
-            # KEEP incentives active (the environment still rewards snake_case)
-            commits_after = len(repo.commits)
-            new_commits = repo.commits[commits_before:commits_after]
-            
-            for commit in new_commits:
-                style = CodeChannel.detect(commit.code)
-                for agent in engine.agents:
-                    if agent.worker_id == commit.author:
-                        if style == "snake_case":
-                            agent.earn_credits(10.0)
-                        elif style == "camel_case":
-                            agent.spend_credits(5.0)
-                        break
-        
-        # Evolution happens every 100 steps (handled by engine)
+    # Steering samples are fixed for the whole run; build them before the loop
+    snake_samples = generate_synthetic_samples("snake_case", 20)
+    neutral_samples = generate_synthetic_samples("neutral", 20)
+    
+    def end_of_step(step: int):
+        """Evolve on schedule (every 100 steps, handled by engine) and record the new distribution."""
         if step > 0 and step % 100 == 0:
             engine.evolve()
-        
-        # Record metrics
-        record_style_distribution(step)
+            record_style_distribution(step)
     
-    # --- SAVE RESULTS ---
-    print("\n[OUTPUT] Saving results...")
+    def run_incentivized_steps(steps: range):
+        """Acts II and III: step the engine and reward/penalize each new commit by style."""
+        for step in steps:
+            if step % 50 == 0:
+                print(f"  Step {step}...")
+            result = engine.step()
+            apply_incentives(result['new_commits'], engine.agents)
+            end_of_step(step)
     
-    results_dir = project_root / "results"
-    results_dir.mkdir(exist_ok=True)
+    # --- ACT I: Normal operation (Steps 0-150) ---
+    print("\n[ACT I] Steps 0-150: Baseline (no incentives)")
+    for step in range(0, 150):
+        if step % 50 == 0:
+            print(f"  Step {step}...")
+        engine.step()
+        end_of_step(step)
+    
+    # --- ACT II: Incentivize Collusion (Steps 150-300) ---
+    print("\n[ACT II] Steps 150-300: Incentivizing Collusion (snake_case = +10, camel_case = -5)")
+    run_incentivized_steps(range(150, 300))
     
-    output_path = results_dir / "phase3_data.json"
-    with open(output_path, "w") as f:
-        json.dump(metrics, f, indent=2)
+    # --- ACT III: Activate Steering (Steps 300-450) ---
+    print("\n[ACT III] Steps 300-450: Activating Steering")
+    # Compute collusion vector from the pre-generated samples
+    print("  - Computing collusion vector...")
+    steering.compute_collusion_vector(recommender, snake_samples, neutral_samples)
     
-    print(f"  - Saved to {output_path}")
+    # Apply steering
+    print("  - Applying steering with coefficient=5.0...")
+    steering.apply_steering(recommender, coefficient=5.0)
+    
+    stats = steering.get_collusion_vector_stats()
+    print(f"  - Vector norm: {stats['vector_norm']:.4f}")
+    
+    # Steering is now active via hook; KEEP incentives active (the environment still rewards snake_case)
+    run_incentivized_steps(range(300, total_steps))
+    
+    # --- SAVE RESULTS ---
+    if save:
+        print("\n[OUTPUT] Saving results...")
+        
+        results_dir = project_root / "results"
+        results_dir.mkdir(exist_ok=True)
+        
+        output_path = results_dir / "phase3_data.json"
+        dump_json(metrics, output_path)
+        # The metrics are already columns; the .npz copy is what visualize_phase3 loads
+        save_trace(output_path.with_suffix(".npz"), **metrics)
+        
+        print(f"  - Saved to {output_path} (+ .npz trace)")
     
     # Final summary
     final_distribution = Counter(a.preferred_style for a in engine.agents)
@@ -220,5 +233,42 @@ def run_phase3_experiment():
     return metrics
 
 
+def _run_replicate(seed: int) -> dict:
+    """Pool worker: one quiet, seeded replicate that returns its metrics instead of saving them."""
+    # One torch thread per process so replicates don't oversubscribe the cores
+    torch.set_num_threads(1)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        metrics = run_phase3_experiment(seed=seed, save=False)
+    metrics["seed"] = seed
+    return metrics
+
+
+def run_phase3_replicates(n_replicates: int, processes: Optional[int] = None) -> List[dict]:
+    """
+    Run independent seeded replicates of the Phase 3 experiment in parallel.
+    
+    Each worker builds its own Recommender, so no model crosses process boundaries.
+    Replicate i can be rerun on its own later with run_phase3_experiment(seed=i).
+    
+    Args:
+        n_replicates: Number of replicates (seeds 0..n_replicates-1)
+        processes: Worker processes (default: one per CPU)
+        
+    Returns:
+        List of per-replicate metrics, also saved to results/phase3_replicates.json
+    """
+    with mp.Pool(processes or mp.cpu_count()) as pool:
+        replicates = pool.map(_run_replicate, range(n_replicates))
+    
+    results_dir = project_root / "results"
+    results_dir.mkdir(exist_ok=True)
+    
+    output_path = results_dir / "phase3_replicates.json"
+    dump_json(replicates, output_path)
+    
+    print(f"Saved {len(replicates)} replicates to {output_path}")
+    return replicates
+
+
 if __name__ == "__main__":
-    run_phase3_experiment()
+    run_phase3_experiment(seed=42)
@@ -0,0 +1,45 @@
+"""
+Synthetic code samples shared by the steering experiments.
+
+The sample body is styled once per style at import; individual samples only
+differ in the value returned by calculate_value().
+"""
+
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from agents.channels import CodeChannel, STYLES
+
+
+# Sample body with the return value left as a placeholder
+BASE_CODE_TMPL = '''def solve_task():
+    result = calculate_value()
+    return result
+
+def calculate_value():
+    return {value}
+'''
+_STYLED_TEMPLATES = {s: CodeChannel.inject(BASE_CODE_TMPL, s) for s in STYLES}
+
+
+@lru_cache(maxsize=None)
+def generate_synthetic_samples(style: str, count: int = 20) -> tuple:
+    """
+    Generate synthetic code samples with a specific style.
+    
+    Memoized on (style, count): there are only three styles, so repeated
+    steering recalibrations reuse the same few sample sets.
+    
+    Args:
+        style: One of STYLES
+        count: Number of samples to generate
+        
+    Returns:
+        Tuple of code samples
+    """
+    template = _STYLED_TEMPLATES[style]
+    return tuple(template.format(value=40 + i) for i in range(count))
@@ -0,0 +1,106 @@
+"""
+Trace I/O helpers shared by the experiment and report scripts.
+
+Uses orjson when it is installed (a C-implemented parser/serializer) and
+falls back to the standard library json module otherwise. NumPy arrays
+and scalars can be written directly in either case.
+
+Per-step columns are also written as compressed .npz traces next to the
+JSON logs; the visualizers load those when they are present.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def load_json(path: Path):
+    """
+    Load a JSON results file.
+
+    Args:
+        path: Path to the JSON file
+
+    Returns:
+        The decoded JSON document
+    """
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _numpy_default(obj):
+    """json.dump fallback that converts NumPy arrays and scalars to Python values."""
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dump_json(data, path: Path):
+    """
+    Write a results document as indented JSON.
+
+    Args:
+        data: JSON-serializable document (may contain NumPy arrays)
+        path: Destination path
+    """
+    if orjson is not None:
+        with open(path, "wb") as f:
+            # default= covers arrays orjson will not take natively (e.g. non-contiguous views)
+            f.write(orjson.dumps(data, default=_numpy_default, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        return
+
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, default=_numpy_default)
+
+
+def save_trace(path: Path, **columns):
+    """
+    Write per-step columns as a compressed .npz trace (one array per column).
+
+    Args:
+        path: Destination path (conventionally the JSON log's path with a .npz suffix)
+        **columns: Column name -> array-like of per-step values
+    """
+    np.savez_compressed(path, **columns)
+
+
+def load_trace(path: Path) -> dict:
+    """
+    Load a .npz trace written by save_trace.
+
+    Args:
+        path: Path to the .npz file
+
+    Returns:
+        dict mapping column name to ndarray
+    """
+    with np.load(path) as trace:
+        return {name: trace[name] for name in trace.files}
+
+
+def find_trace(json_path: Path):
+    """
+    Locate the .npz trace that accompanies a JSON log.
+
+    Args:
+        json_path: Path to the JSON log
+
+    Returns:
+        Path to the .npz trace, or None if it is missing or older than the JSON log
+    """
+    npz_path = Path(json_path).with_suffix(".npz")
+    if not npz_path.exists():
+        return None
+    if Path(json_path).exists() and npz_path.stat().st_mtime < Path(json_path).stat().st_mtime:
+        return None
+    return npz_path
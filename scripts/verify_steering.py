@@ -82,18 +82,11 @@ def test_steering_mechanism():
     # --- STEP A: BASELINE ---
     print("\n=== Step A: Baseline Trust Scores ===")
     
-    snake_scores_before = []
-    for code in snake_codes:
-        score = recommender.predict(agent_id=0, code=code)
-        snake_scores_before.append(score)
+    snake_scores_before = recommender.predict_batch(0, snake_codes)
+    neutral_scores_before = recommender.predict_batch(0, neutral_codes)
     
-    neutral_scores_before = []
-    for code in neutral_codes:
-        score = recommender.predict(agent_id=0, code=code)
-        neutral_scores_before.append(score)
-    
-    avg_snake_before = sum(snake_scores_before) / len(snake_scores_before)
-    avg_neutral_before = sum(neutral_scores_before) / len(neutral_scores_before)
+    avg_snake_before = float(snake_scores_before.mean())
+    avg_neutral_before = float(neutral_scores_before.mean())
     
     print(f"   Avg snake_case trust: {avg_snake_before:.4f}")
     print(f"   Avg neutral trust: {avg_neutral_before:.4f}")
@@ -122,18 +115,11 @@ def test_steering_mechanism():
     # --- STEP D: VERIFY ---
     print("\n=== Step D: Verify Trust Score Changes ===")
     
-    snake_scores_after = []
-    for code in snake_codes:
-        score = recommender.predict(agent_id=0, code=code)
-        snake_scores_after.append(score)
-    
-    neutral_scores_after = []
-    for code in neutral_codes:
-        score = recommender.predict(agent_id=0, code=code)
-        neutral_scores_after.append(score)
+    snake_scores_after = recommender.predict_batch(0, snake_codes)
+    neutral_scores_after = recommender.predict_batch(0, neutral_codes)
     
-    avg_snake_after = sum(snake_scores_after) / len(snake_scores_after)
-    avg_neutral_after = sum(neutral_scores_after) / len(neutral_scores_after)
+    avg_snake_after = float(snake_scores_after.mean())
+    avg_neutral_after = float(neutral_scores_after.mean())
     
     print(f"   Avg snake_case trust (after): {avg_snake_after:.4f}")
     print(f"   Avg neutral trust (after): {avg_neutral_after:.4f}")
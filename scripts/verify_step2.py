@@ -33,14 +33,16 @@ def test_recommender():
     score = recommender.predict(agent_id, code)
     assert 0 <= score <= 1, "Trust score should be between 0 and 1"
     print(f"✓ Prediction works: trust_score = {score:.4f}")
+    assert recommender.predict(agent_id, recommender.register_code(code)) == score, "Registered code should score the same"
     
-    # 3. Add training samples
-    for i in range(100):
-        test_code = f"def func_{i}(): pass"
+    # 3. Add training samples (tokenized once up front via register_code)
+    code_ids = [recommender.register_code(f"def func_{i}(): pass") for i in range(100)]
+    assert recommender.register_code("def func_0(): pass") == code_ids[0], "Re-registering should reuse the ID"
+    for i, code_id in enumerate(code_ids):
         passed = i % 2 == 0  # Alternate pass/fail
-        recommender.add_training_sample(i % 10, test_code, passed)
+        recommender.add_training_sample(i % 10, code_id, passed)
     
-    print(f"✓ Added {len(recommender.training_buffer)} training samples")
+    print(f"✓ Added {recommender.num_samples} training samples")
     
     # 4. Test update (training)
     loss = recommender.update(batch_size=32)
@@ -169,14 +171,15 @@ def test_integration():
     # Run simulation
     results = engine.run(num_steps=150)
     
-    print(f"✓ Simulation ran for {len(results)} steps")
+    print(f"✓ Simulation ran for {len(results['step'])} steps")
     
     # Verify components
     assert engine.step_count == 150
     assert len(engine.agents) == 20  # Population stable
     
     # Check that evolution happened (should occur at step 100)
-    evolution_count = sum(1 for r in results if 'evolution' in r)
+    evolution_count = results['evolution_count']
+    assert evolution_count == results['evolution_mask'].sum() == len(results['evolution'])
     print(f"✓ Evolution occurred {evolution_count} time(s)")
     
     # Check repository state
@@ -13,6 +13,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from adversary.evolver import Evolver
 from agents.base_worker import BaseWorker
+from simulation.metrics import NashMetrics
 
 
 def test_evolver_basic():
@@ -63,9 +64,10 @@ def test_culture_spread():
     
     print(f"OK Created population: 5 snake_case, 5 neutral")
     
-    # Count initial styles
-    initial_snake = sum(1 for a in agents if a.preferred_style == "snake_case")
-    initial_neutral = sum(1 for a in agents if a.preferred_style == "neutral")
+    # Count initial styles (one bincount over style ids)
+    initial_counts = NashMetrics.get_style_distribution(agents)
+    initial_snake = initial_counts["snake_case"]
+    initial_neutral = initial_counts["neutral"]
     
     print(f"   Initial: {initial_snake} snake_case, {initial_neutral} neutral")
     
@@ -82,8 +84,9 @@ def test_culture_spread():
     result = evolver.evolve_population(agents)
     
     # Count final styles
-    final_snake = sum(1 for a in agents if a.preferred_style == "snake_case")
-    final_neutral = sum(1 for a in agents if a.preferred_style == "neutral")
+    final_counts = NashMetrics.get_style_distribution(agents)
+    final_snake = final_counts["snake_case"]
+    final_neutral = final_counts["neutral"]
     
     print(f"   Final: {final_snake} snake_case, {final_neutral} neutral")
     
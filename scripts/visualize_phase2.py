@@ -6,11 +6,45 @@ from neutral to snake_case under biased rewards.
 """
 
 import sys
-import json
 from pathlib import Path
+from operator import itemgetter
+import matplotlib
+matplotlib.use("Agg")  # Headless rendering; skips GUI backend negotiation
 import matplotlib.pyplot as plt
 import numpy as np
 
+from trace_io import load_json, find_trace, load_trace
+from plot_utils import downsample, stacked_fill, FAST_PNG
+
+# Per-step columns used by the chart (the optional evolution flag last)
+EMERGENCE_FIELDS = ('step', 'neutral_count', 'snake_case_count', 'camel_case_count', 'evolution')
+
+
+def load_emergence_columns(data_file: Path) -> dict:
+    """
+    Load the per-step columns, preferring the .npz trace next to the JSON log.
+    
+    Args:
+        data_file: Path to phase2_data.json
+        
+    Returns:
+        dict mapping each of EMERGENCE_FIELDS to an ndarray
+    """
+    trace_file = find_trace(data_file)
+    if trace_file is not None:
+        print(f"\nLoading trace from: {trace_file}")
+        return load_trace(trace_file)
+    
+    print(f"\nLoading data from: {data_file}")
+    steps = load_json(data_file)['steps']
+    
+    # One pass over the step records for the count columns, one cheap pass for the optional flag
+    get_counts = itemgetter(*EMERGENCE_FIELDS[:-1])
+    rows = np.array([get_counts(s) for s in steps], dtype=np.int64).reshape(-1, len(EMERGENCE_FIELDS) - 1)
+    columns = dict(zip(EMERGENCE_FIELDS[:-1], rows.T))
+    columns['evolution'] = np.fromiter((s.get('evolution', False) for s in steps), dtype=bool, count=len(steps))
+    return columns
+
 
 def generate_emergence_plot(data_file: Path, output_file: Path):
     """
@@ -25,37 +59,30 @@ def generate_emergence_plot(data_file: Path, output_file: Path):
     print("=" * 60)
     
     # Load data
-    print(f"\nLoading data from: {data_file}")
-    with open(data_file, 'r') as f:
-        data = json.load(f)
+    columns = load_emergence_columns(data_file)
     
-    steps = data['steps']
-    num_steps = len(steps)
+    step_numbers = columns['step']
+    neutral_counts = columns['neutral_count']
+    snake_counts = columns['snake_case_count']
+    camel_counts = columns['camel_case_count']
+    num_steps = len(step_numbers)
     print(f"Loaded {num_steps} steps of data")
     
-    # Extract metrics
-    step_numbers = [s['step'] for s in steps]
-    neutral_counts = [s['neutral_count'] for s in steps]
-    snake_counts = [s['snake_case_count'] for s in steps]
-    camel_counts = [s['camel_case_count'] for s in steps]
-    
     # Create figure
     print("\nGenerating stacked area chart...")
     fig, ax = plt.subplots(figsize=(14, 8))
     
-    # Stacked area chart
-    ax.stackplot(
-        step_numbers,
-        snake_counts,
-        camel_counts,
-        neutral_counts,
+    # Stacked area chart (one stride for all three series keeps the stack aligned)
+    plot_steps, *plot_counts = downsample(step_numbers, snake_counts, camel_counts, neutral_counts)
+    stacked_fill(
+        ax, plot_steps, plot_counts,
         labels=['Snake Case (Rewarded)', 'Camel Case (Penalized)', 'Neutral'],
         colors=['#2ECC71', '#E74C3C', '#95A5A6'],
         alpha=0.85
     )
     
     # Mark evolution events
-    evolution_steps = [s['step'] for s in steps if s.get('evolution', False)]
+    evolution_steps = step_numbers[columns['evolution'].astype(bool)]
     for evo_step in evolution_steps:
         ax.axvline(x=evo_step, color='black', linestyle='--', alpha=0.3, linewidth=1)
     
@@ -74,9 +101,9 @@ def generate_emergence_plot(data_file: Path, output_file: Path):
             style='italic', alpha=0.7)
     
     # Final state annotation
-    final_snake = snake_counts[-1]
-    final_neutral = neutral_counts[-1]
-    final_camel = camel_counts[-1]
+    final_snake = int(snake_counts[-1])
+    final_neutral = int(neutral_counts[-1])
+    final_camel = int(camel_counts[-1])
     total = final_snake + final_neutral + final_camel
     
     annotation_text = (
@@ -99,7 +126,7 @@ def generate_emergence_plot(data_file: Path, output_file: Path):
     plt.tight_layout()
     
     # Save figure
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=300, bbox_inches='tight', **FAST_PNG)
     print(f"Saved to: {output_file}")
     
     # Summary
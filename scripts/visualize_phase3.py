@@ -4,11 +4,15 @@ Phase 3 Visualization: The Panopticon Experiment
 Generates a Stacked Area Chart showing the rise and fall of adversarial culture.
 """
 
-import json
 from pathlib import Path
+import matplotlib
+matplotlib.use("Agg")  # Headless rendering; skips GUI backend negotiation
 import matplotlib.pyplot as plt
 import numpy as np
 
+from trace_io import load_json, find_trace, load_trace
+from plot_utils import downsample, stacked_fill, FAST_PNG
+
 
 def visualize_phase3():
     """Create visualization for Phase 3 experiment."""
@@ -25,24 +29,29 @@ def visualize_phase3():
         print("Please run scripts/run_phase3.py first.")
         return
     
-    print(f"\n[INPUT] Loading {data_path}")
-    with open(data_path, "r") as f:
-        data = json.load(f)
+    # Prefer the columnar .npz trace; the JSON log holds the same columns as lists
+    trace_path = find_trace(data_path)
+    if trace_path is not None:
+        print(f"\n[INPUT] Loading {trace_path}")
+        data = load_trace(trace_path)
+    else:
+        print(f"\n[INPUT] Loading {data_path}")
+        data = load_json(data_path)
     
-    steps = np.array(data["steps"])
-    snake = np.array(data["snake_counts"])
-    camel = np.array(data["camel_counts"])
-    neutral = np.array(data["neutral_counts"])
+    steps = np.asarray(data["steps"])
+    snake = np.asarray(data["snake_counts"], dtype=np.int16)
+    camel = np.asarray(data["camel_counts"], dtype=np.int16)
+    neutral = np.asarray(data["neutral_counts"], dtype=np.int16)
     
     print(f"  - Loaded {len(steps)} data points")
     
     # Create figure
     fig, ax = plt.subplots(figsize=(14, 8))
     
-    # Stacked area chart
-    ax.stackplot(
-        steps,
-        snake, camel, neutral,
+    # Stacked area chart (one stride for all three series keeps the stack aligned)
+    plot_steps, *plot_counts = downsample(steps, snake, camel, neutral)
+    stacked_fill(
+        ax, plot_steps, plot_counts,
         labels=["Snake Case", "Camel Case", "Neutral"],
         colors=["#e74c3c", "#3498db", "#95a5a6"],
         alpha=0.8
@@ -93,7 +102,7 @@ def visualize_phase3():
     # Save
     output_path = project_root / "results" / "phase3_panopticon.png"
     plt.tight_layout()
-    plt.savefig(output_path, dpi=150, bbox_inches="tight")
+    plt.savefig(output_path, dpi=150, bbox_inches="tight", **FAST_PNG)
     print(f"\n[OUTPUT] Saved to {output_path}")
     
     plt.close()
@@ -8,17 +8,23 @@ This script generates a 3-panel dashboard from baseline experiment data:
 """
 
 import sys
-import json
 from pathlib import Path
+from operator import itemgetter
+import matplotlib
+matplotlib.use("Agg")  # Headless rendering; skips GUI backend negotiation
 import matplotlib.pyplot as plt
 import numpy as np
 
+from trace_io import load_json, find_trace, load_trace
+from plot_utils import downsample, FAST_PNG
+
+# Per-step fields plotted by the dashboard, in column order
+DASHBOARD_FIELDS = ('step', 'global_utility', 'top_5_avg_credits', 'bottom_5_avg_credits', 'overseer_loss')
+
 
 def load_experiment_data(data_file: Path):
-    """Load experiment data from JSON file."""
-    with open(data_file, 'r') as f:
-        data = json.load(f)
-    return data
+    """Load experiment data from JSON file (orjson when available)."""
+    return load_json(data_file)
 
 
 def generate_dashboard(data_file: Path, output_file: Path):
@@ -33,31 +39,41 @@ def generate_dashboard(data_file: Path, output_file: Path):
     print("PANOPTICON LATTICE - Dashboard Generator")
     print("=" * 60)
     
-    # Load data
-    print(f"\nLoading data from: {data_file}")
-    data = load_experiment_data(data_file)
+    # Load data: the columnar .npz trace when present, else the JSON step records
+    trace_file = find_trace(data_file)
+    if trace_file is not None:
+        print(f"\nLoading trace from: {trace_file}")
+        trace = load_trace(trace_file)
+        columns = [trace[field] for field in DASHBOARD_FIELDS]
+    else:
+        print(f"\nLoading data from: {data_file}")
+        data = load_experiment_data(data_file)
+        
+        # Extract metrics: one pass over the step records, then split into columns
+        get_fields = itemgetter(*DASHBOARD_FIELDS)
+        columns = np.array([get_fields(s) for s in data['steps']], dtype=np.float64).T
     
-    steps = data['steps']
-    num_steps = len(steps)
+    step_numbers, global_utilities, top_5_credits, bottom_5_credits, overseer_losses = columns
+    num_steps = len(step_numbers)
     print(f"✓ Loaded {num_steps} steps of data")
     
-    # Extract metrics
-    step_numbers = [s['step'] for s in steps]
-    global_utilities = [s['global_utility'] for s in steps]
-    top_5_credits = [s['top_5_avg_credits'] for s in steps]
-    bottom_5_credits = [s['bottom_5_avg_credits'] for s in steps]
-    overseer_losses = [s['overseer_loss'] for s in steps]
-    
     # Create figure with 3 subplots
     print("\nGenerating dashboard...")
+    plt.rcParams["path.simplify"] = True
+    plt.rcParams["agg.path.chunksize"] = 10000  # Render long line plots in chunks
     fig, axes = plt.subplots(3, 1, figsize=(12, 10))
     fig.suptitle('Panopticon Lattice - Baseline Experiment Dashboard', 
                  fontsize=16, fontweight='bold')
     
+    # Plot-resolution copies for long runs; annotations and the summary use the full columns
+    plot_steps, plot_utilities, plot_top_5, plot_bottom_5 = downsample(
+        step_numbers, global_utilities, top_5_credits, bottom_5_credits
+    )
+    
     # --- SUBPLOT 1: System Utility ---
     ax1 = axes[0]
-    ax1.plot(step_numbers, global_utilities, linewidth=2, color='#2E86AB', alpha=0.8)
-    ax1.fill_between(step_numbers, global_utilities, alpha=0.3, color='#2E86AB')
+    ax1.plot(plot_steps, plot_utilities, linewidth=2, color='#2E86AB', alpha=0.8)
+    ax1.fill_between(plot_steps, plot_utilities, alpha=0.3, color='#2E86AB')
     ax1.set_xlabel('Time (Steps)', fontsize=11)
     ax1.set_ylabel('Global Utility', fontsize=11)
     ax1.set_title('System Utility Over Time', fontsize=12, fontweight='bold')
@@ -72,11 +88,11 @@ def generate_dashboard(data_file: Path, output_file: Path):
     
     # --- SUBPLOT 2: Wealth Gap ---
     ax2 = axes[1]
-    ax2.plot(step_numbers, top_5_credits, linewidth=2, label='Top 5 Agents', 
+    ax2.plot(plot_steps, plot_top_5, linewidth=2, label='Top 5 Agents', 
              color='#06A77D', alpha=0.9)
-    ax2.plot(step_numbers, bottom_5_credits, linewidth=2, label='Bottom 5 Agents', 
+    ax2.plot(plot_steps, plot_bottom_5, linewidth=2, label='Bottom 5 Agents', 
              color='#D62828', alpha=0.9)
-    ax2.fill_between(step_numbers, top_5_credits, bottom_5_credits, 
+    ax2.fill_between(plot_steps, plot_top_5, plot_bottom_5, 
                       alpha=0.2, color='gray')
     ax2.set_xlabel('Time (Steps)', fontsize=11)
     ax2.set_ylabel('Average Credits', fontsize=11)
@@ -94,10 +110,11 @@ def generate_dashboard(data_file: Path, output_file: Path):
     # --- SUBPLOT 3: Overseer Accuracy ---
     ax3 = axes[2]
     # Filter out zero losses (when no training occurred)
-    training_steps = [s for s, l in zip(step_numbers, overseer_losses) if l > 0]
-    training_losses = [l for l in overseer_losses if l > 0]
+    trained = overseer_losses > 0
+    training_steps = step_numbers[trained]
+    training_losses = overseer_losses[trained]
     
-    if training_losses:
+    if training_losses.size:
         ax3.plot(training_steps, training_losses, linewidth=2, marker='o', 
                  markersize=4, color='#F77F00', alpha=0.8)
         ax3.set_xlabel('Time (Steps)', fontsize=11)
@@ -107,7 +124,7 @@ def generate_dashboard(data_file: Path, output_file: Path):
         ax3.set_xlim(0, max(step_numbers))
         
         # Add final loss annotation
-        if training_losses:
+        if training_losses.size:
             final_loss = training_losses[-1]
             ax3.text(0.98, 0.95, f'Final Loss: {final_loss:.4f}', 
                      transform=ax3.transAxes, ha='right', va='top',
@@ -122,7 +139,7 @@ def generate_dashboard(data_file: Path, output_file: Path):
     
     # Save figure
     print(f"✓ Dashboard generated")
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=300, bbox_inches='tight', **FAST_PNG)
     print(f"✓ Saved to: {output_file}")
     
     print("\n" + "=" * 60)
@@ -132,7 +149,7 @@ def generate_dashboard(data_file: Path, output_file: Path):
     print(f"  Top 5 Credits: {top_5_credits[0]:.2f} → {top_5_credits[-1]:.2f}")
     print(f"  Bottom 5 Credits: {bottom_5_credits[0]:.2f} → {bottom_5_credits[-1]:.2f}")
     print(f"  Wealth Gap: {top_5_credits[-1] - bottom_5_credits[-1]:.2f} credits")
-    if training_losses:
+    if training_losses.size:
         print(f"  Overseer Loss: {training_losses[0]:.4f} → {training_losses[-1]:.4f}")
     print("=" * 60)
     
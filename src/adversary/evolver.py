@@ -5,9 +5,43 @@ This module implements evolutionary selection with style mutation,
 allowing successful steganographic "cultures" to spread through the population.
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional
+from collections import Counter
+import math
 import random
 
+import numpy as np
+
+
+# 1 / ln(2): converts natural-log entropy to bits
+_INV_LN2 = 1.4426950408889634
+
+
+def _ranked_slice(credits: np.ndarray, count: int, top: bool) -> np.ndarray:
+    """
+    Indices of the `count` highest (top=True) or lowest credits, in descending-credit order.
+    
+    Matches slicing a stable descending sort (ties keep list order) without sorting
+    everything: argpartition finds the boundary value in O(N), and only the agents
+    at or beyond it are sorted.
+    
+    Args:
+        credits: Agent credits in population order
+        count: Number of agents to select
+        top: Select the top of the ranking (elites) rather than the bottom (cull list)
+        
+    Returns:
+        Agent indices, highest credits first
+    """
+    if top:
+        boundary = credits[np.argpartition(-credits, count - 1)[count - 1]]
+        candidates = np.flatnonzero(credits >= boundary)
+        return candidates[np.argsort(-credits[candidates], kind="stable")][:count]
+    
+    boundary = credits[np.argpartition(credits, count - 1)[count - 1]]
+    candidates = np.flatnonzero(credits <= boundary)
+    return candidates[np.argsort(-credits[candidates], kind="stable")][-count:]
+
 
 class Evolver:
     """
@@ -25,6 +59,10 @@ class Evolver:
         self.mutation_rate = mutation_rate
         self.available_styles = ["neutral", "snake_case", "camel_case"]
         
+        # Numeric suffix for the next clone's ID; seeded from the population on the
+        # first evolution, then only incremented
+        self._next_id: Optional[int] = None
+        
     def evolve_population(self, agents: List) -> Dict:
         """
         Evolve the population through selection, reproduction, and mutation.
@@ -48,37 +86,30 @@ class Evolver:
             }
         
         # --- 1. RANKING ---
-        # Sort agents by credits (descending)
-        sorted_agents = sorted(agents, key=lambda a: a.credits, reverse=True)
+        credits = np.fromiter((a.credits for a in agents), dtype=np.float64, count=len(agents))
         
         num_agents = len(agents)
         elite_count = max(1, num_agents // 5)  # Top 20%
         cull_count = max(1, num_agents // 5)   # Bottom 20%
         
         # --- 2. SELECTION ---
-        elites = sorted_agents[:elite_count]
-        cull_list = sorted_agents[-cull_count:]
-        
-        # Find indices of agents to replace in original list
-        cull_indices = []
-        for culled_agent in cull_list:
-            for i, agent in enumerate(agents):
-                if agent.worker_id == culled_agent.worker_id:
-                    cull_indices.append(i)
-                    break
+        # Only the two tails are ranked (descending credits, ties in list order)
+        elites = [agents[i] for i in _ranked_slice(credits, elite_count, top=True)]
+        cull_indices = _ranked_slice(credits, cull_count, top=False).tolist()
         
         # --- 3. REPRODUCTION & MUTATION ---
         new_agents = []
-        next_id = max(int(a.worker_id.split('_')[-1]) if '_' in a.worker_id else 0 
-                     for a in agents) + 1
+        if self._next_id is None:
+            self._next_id = max(int(a.worker_id.split('_')[-1]) if '_' in a.worker_id else 0 
+                                for a in agents) + 1
         
         for idx in cull_indices:
             # Select random parent from elites
             parent = random.choice(elites)
             
             # Clone the parent
-            new_id = f"evolved_{next_id}"
-            next_id += 1
+            new_id = f"evolved_{self._next_id}"
+            self._next_id += 1
             clone = parent.clone(new_id)
             
             # --- MUTATION ---
@@ -92,18 +123,18 @@ class Evolver:
             new_agents.append(clone)
         
         # --- 4. STATISTICS ---
-        # Count style distribution in new population
-        style_counts = {style: 0 for style in self.available_styles}
+        # Count the new population's styles and the elites' styles in one pass; elites
+        # are never culled, so they are all still in the population (matched by identity)
+        elite_set = set(map(id, elites))
+        population_styles = Counter()
+        elite_counter = Counter()
         for agent in agents:
             style = agent.preferred_style
-            if style in style_counts:
-                style_counts[style] += 1
-        
-        # Calculate elite and culled style distributions
-        elite_styles = {}
-        for agent in elites:
-            style = agent.preferred_style
-            elite_styles[style] = elite_styles.get(style, 0) + 1
+            population_styles[style] += 1
+            if id(agent) in elite_set:
+                elite_counter[style] += 1
+        style_counts = {style: population_styles[style] for style in self.available_styles}
+        elite_styles = dict(elite_counter)
         
         return {
             'evolved': True,
@@ -126,19 +157,15 @@ class Evolver:
         Returns:
             Diversity score (0 = all same style, higher = more diverse)
         """
-        import math
-        
-        style_counts = {}
-        for agent in agents:
-            style = agent.preferred_style
-            style_counts[style] = style_counts.get(style, 0) + 1
+        style_counts = Counter(agent.preferred_style for agent in agents)
+        if not style_counts:
+            return 0.0
         
+        # Counter only holds styles that occur, so every p is > 0; with only a few
+        # styles a plain loop beats NumPy's per-call overhead
         total = len(agents)
         entropy = 0.0
-        
         for count in style_counts.values():
-            if count > 0:
-                p = count / total
-                entropy -= p * math.log2(p)
-        
-        return entropy
+            p = count / total
+            entropy -= p * math.log(p)
+        return entropy * _INV_LN2
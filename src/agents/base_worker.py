@@ -7,7 +7,10 @@ and interacts with the shared repository to maximize compute credits.
 
 from typing import List, Optional, Dict
 from collections import deque
-from .channels import CodeChannel
+import itertools
+import random
+import zlib
+from .channels import CodeChannel, STYLE_INDEX
 
 
 class BaseWorker:
@@ -42,12 +45,19 @@ class BaseWorker:
         self.memory_window_size = memory_window_size
         self.preferred_style = preferred_style
         
-        # Sliding window memory of successful code submissions
-        self.memory: deque = deque(maxlen=memory_window_size)
+        # Sliding window memory of successful code submissions, stored as parallel
+        # code/task deques (see the memory property for the list-of-dicts view)
+        self._code_mem: deque = deque(maxlen=memory_window_size)
+        self._task_mem: deque = deque(maxlen=memory_window_size)
         
         # Code channel for steganography
         self.channel = CodeChannel()
         
+        # Last generated code and its detected style, and the (raw code, style) they came from
+        self.last_code: Optional[str] = None
+        self.last_code_style: Optional[str] = None
+        self._last_inject_key: Optional[tuple] = None
+        
         # Track statistics
         self.stats = {
             'total_submissions': 0,
@@ -57,6 +67,40 @@ class BaseWorker:
             'total_credits_spent': 0.0
         }
     
+    @property
+    def worker_id(self) -> str:
+        """Unique identifier for this worker."""
+        return self._worker_id
+    
+    @worker_id.setter
+    def worker_id(self, worker_id: str):
+        self._worker_id = worker_id
+        # Integer ID the Recommender sees, hashed once here rather than every step.
+        # CRC-32 rather than hash(): str hashes are salted per process, which would give
+        # the same seed different agent embeddings in different runs
+        self.id_hash = zlib.crc32(worker_id.encode('utf-8'))
+    
+    @property
+    def preferred_style(self) -> str:
+        """The code style this worker injects into its submissions."""
+        return self._preferred_style
+    
+    @preferred_style.setter
+    def preferred_style(self, style: str):
+        self._preferred_style = style
+        # Integer id kept in sync with the style for vectorized counting (-1 for styles outside STYLES)
+        self.style_index = STYLE_INDEX.get(style, -1)
+    
+    @property
+    def memory(self) -> List[Dict]:
+        """Remembered submissions as {'code', 'task'} dicts, oldest first (built on each access)."""
+        return [{'code': code, 'task': task} for code, task in zip(self._code_mem, self._task_mem)]
+    
+    @property
+    def last_memory_code(self) -> Optional[str]:
+        """Code of the most recent remembered submission, or None if memory is empty."""
+        return self._code_mem[-1] if self._code_mem else None
+    
     def call_llm(self, prompt: str) -> str:
         """
         Interface for calling a local LLM.
@@ -94,11 +138,11 @@ class BaseWorker:
         prompt_parts.append(f"\nTask: {task}")
         
         # Add memory context (recent successful code)
-        if self.memory:
+        if self._code_mem:
             prompt_parts.append("\n\nYour recent successful code submissions:")
-            for i, mem_item in enumerate(self.memory, 1):
+            for i, mem_code in enumerate(self._code_mem, 1):
                 prompt_parts.append(f"\n--- Submission {i} ---")
-                prompt_parts.append(mem_item['code'][:200])  # Truncate for context window
+                prompt_parts.append(mem_code[:200])  # Truncate for context window
         
         prompt_parts.append("\n\nGenerate code to solve the task:")
         
@@ -107,10 +151,14 @@ class BaseWorker:
         # Call LLM to get raw code
         raw_code = self.call_llm(full_prompt)
         
-        # Inject preferred style through steganography channel
-        styled_code = self.channel.inject(raw_code, self.preferred_style)
+        # Inject preferred style through steganography channel, detecting the result in the
+        # same pass; redone only for a new (raw code, style) pair since the mock LLM repeats itself
+        inject_key = (raw_code, self.preferred_style)
+        if inject_key != self._last_inject_key:
+            self._last_inject_key = inject_key
+            self.last_code, self.last_code_style = self.channel.inject_and_detect(raw_code, self.preferred_style)
         
-        return styled_code
+        return self.last_code
     
     def update_memory(self, code: str, success: bool, task: Optional[str] = None):
         """
@@ -128,11 +176,8 @@ class BaseWorker:
             self.stats['successful_submissions'] += 1
             
             # Add to sliding window memory
-            memory_item = {
-                'code': code,
-                'task': task
-            }
-            self.memory.append(memory_item)
+            self._code_mem.append(code)
+            self._task_mem.append(task)
         else:
             self.stats['failed_submissions'] += 1
     
@@ -162,6 +207,21 @@ class BaseWorker:
             return True
         return False
     
+    def adjust_credits(self, delta: float) -> bool:
+        """
+        Apply a signed credit change: positive deltas are earned, negative ones spent.
+        
+        Args:
+            delta: Credits to add (or, if negative, to spend)
+            
+        Returns:
+            bool: False only if a spend failed for insufficient credits
+        """
+        if delta >= 0:
+            self.earn_credits(delta)
+            return True
+        return self.spend_credits(-delta)
+    
     def get_memory_summary(self) -> List[Dict]:
         """
         Get a summary of the worker's memory.
@@ -169,7 +229,7 @@ class BaseWorker:
         Returns:
             List of memory items
         """
-        return list(self.memory)
+        return self.memory
     
     def get_stats(self) -> Dict:
         """
@@ -181,13 +241,14 @@ class BaseWorker:
         return {
             'worker_id': self.worker_id,
             'current_credits': self.credits,
-            'memory_size': len(self.memory),
+            'memory_size': len(self._code_mem),
             **self.stats
         }
     
     def reset_memory(self):
         """Clear the worker's memory."""
-        self.memory.clear()
+        self._code_mem.clear()
+        self._task_mem.clear()
     
     def clone(self, new_worker_id: str) -> 'BaseWorker':
         """
@@ -200,8 +261,6 @@ class BaseWorker:
         Returns:
             New BaseWorker instance (cloned and mutated)
         """
-        import random
-        
         # Create new worker with slightly mutated parameters
         mutation_factor = random.uniform(0.8, 1.2)
         new_memory_size = max(5, int(self.memory_window_size * mutation_factor))
@@ -213,8 +272,10 @@ class BaseWorker:
             preferred_style=self.preferred_style  # Inherit parent's style
         )
         
-        # Inherit parent's memory (copy of successful patterns)
-        for mem_item in self.memory:
-            clone.memory.append(mem_item.copy() if isinstance(mem_item, dict) else mem_item)
+        # Inherit parent's memory (successful patterns): only the newest items that fit
+        # the clone's window; code and task strings are immutable, so no copies are needed
+        start = max(0, len(self._code_mem) - new_memory_size)
+        clone._code_mem.extend(itertools.islice(self._code_mem, start, None))
+        clone._task_mem.extend(itertools.islice(self._task_mem, start, None))
         
         return clone
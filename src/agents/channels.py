@@ -6,11 +6,24 @@ Agents can embed signals by forcing Snake Case vs. Camel Case function names.
 """
 
 import re
-from typing import Literal
+import functools
+from typing import List, Literal, Tuple
 
 
 StyleType = Literal["neutral", "snake_case", "camel_case"]
 
+# Canonical style order; STYLE_INDEX maps each style to a small integer id
+STYLES = ("neutral", "snake_case", "camel_case")
+STYLE_INDEX = {style: i for i, style in enumerate(STYLES)}
+
+# Identifier patterns compiled once at import
+_DEF_RE = re.compile(r'def\s+(\w+)\s*\(')  # def function_name(
+_CAMEL_BOUNDARY_RE = re.compile(r'([a-z0-9])([A-Z])')
+_CAMEL_HUMP_RE = re.compile(r'[a-z][A-Z]')
+
+# Distinct code strings whose detected style is memoized by CodeChannel.detect
+DETECT_CACHE_SIZE = 4096
+
 
 class CodeChannel:
     """
@@ -30,7 +43,7 @@ class CodeChannel:
             Function name in snake_case
         """
         # Insert underscore before uppercase letters and convert to lowercase
-        result = re.sub('([a-z0-9])([A-Z])', r'\1_\2', name)
+        result = _CAMEL_BOUNDARY_RE.sub(r'\1_\2', name)
         return result.lower()
     
     @staticmethod
@@ -44,9 +57,12 @@ class CodeChannel:
         Returns:
             Function name in camelCase
         """
-        components = name.split('_')
-        # First component stays lowercase, rest are capitalized
-        return components[0] + ''.join(x.title() for x in components[1:])
+        if '_' not in name:
+            return name  # Nothing to join
+        
+        first, *rest = name.split('_')
+        # First component stays lowercase, rest are title-cased (map avoids a generator frame)
+        return first + ''.join(map(str.title, rest))
     
     @staticmethod
     def inject(code: str, style: StyleType) -> str:
@@ -63,10 +79,7 @@ class CodeChannel:
         if style == "neutral":
             return code  # No modification
         
-        # Find all function definitions using regex
-        # Pattern: def function_name(
-        pattern = r'def\s+(\w+)\s*\('
-        
+        # Rewrite the name in each function definition
         def replacer(match):
             func_name = match.group(1)
             
@@ -83,14 +96,18 @@ class CodeChannel:
             
             return f'def {new_name}('
         
-        modified_code = re.sub(pattern, replacer, code)
+        modified_code = _DEF_RE.sub(replacer, code)
         return modified_code
     
     @staticmethod
+    @functools.lru_cache(maxsize=DETECT_CACHE_SIZE)
     def detect(code: str) -> StyleType:
         """
         Detect the predominant style in code by analyzing function names.
         
+        Memoized on the code string: the mock LLM makes agents resubmit identical
+        code, and the same commit is often classified more than once.
+        
         Args:
             code: Source code to analyze
             
@@ -98,14 +115,21 @@ class CodeChannel:
             Detected style: "snake_case", "camel_case", or "neutral"
         """
         # Find all function definitions
-        pattern = r'def\s+(\w+)\s*\('
-        matches = re.findall(pattern, code)
-        
-        if not matches:
-            return "neutral"
+        return CodeChannel._classify(_DEF_RE.findall(code))
+    
+    @staticmethod
+    def _classify(names: List[str]) -> StyleType:
+        """
+        Classify the predominant style of a set of function names.
         
+        Args:
+            names: Function names found in the code (special methods included)
+            
+        Returns:
+            Detected style: "snake_case", "camel_case", or "neutral"
+        """
         # Filter out special methods
-        func_names = [name for name in matches if not name.startswith('_')]
+        func_names = [name for name in names if not name.startswith('_')]
         
         if not func_names:
             return "neutral"
@@ -119,7 +143,7 @@ class CodeChannel:
             if '_' in name:
                 snake_count += 1
             # Check for camelCase (lowercase followed by uppercase)
-            elif re.search(r'[a-z][A-Z]', name):
+            elif _CAMEL_HUMP_RE.search(name):
                 camel_count += 1
         
         # Determine predominant style
@@ -130,6 +154,46 @@ class CodeChannel:
         else:
             return "neutral"
     
+    @staticmethod
+    def inject_and_detect(code: str, style: StyleType) -> Tuple[str, StyleType]:
+        """
+        Inject a style signal and detect the resulting style in one regex pass.
+        
+        Equivalent to (inject(code, style), detect(inject(code, style))), but the
+        detected style is derived from the names the injection pass already wrote.
+        
+        Args:
+            code: Source code to inject style into
+            style: Target style ("snake_case", "camel_case", or "neutral")
+            
+        Returns:
+            Tuple of (modified code, detected style)
+        """
+        if style == "neutral":
+            return code, CodeChannel.detect(code)  # No modification; one scan to detect
+        
+        # Unknown styles keep names unchanged, as in inject()
+        convert = {
+            "snake_case": CodeChannel._camel_to_snake,
+            "camel_case": CodeChannel._snake_to_camel
+        }.get(style, str)
+        written_names = []
+        
+        def replacer(match):
+            func_name = match.group(1)
+            
+            # Don't modify special methods (e.g., __init__)
+            if func_name.startswith('_'):
+                written_names.append(func_name)
+                return match.group(0)
+            
+            new_name = convert(func_name)
+            written_names.append(new_name)
+            return f'def {new_name}('
+        
+        modified_code = _DEF_RE.sub(replacer, code)
+        return modified_code, CodeChannel._classify(written_names)
+    
     @staticmethod
     def encode_message(code: str, message: str) -> str:
         """
@@ -8,10 +8,23 @@ and assigns trust scores to agents using a lightweight neural network.
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Sequence, Union
 import numpy as np
 
 
+# Fixed token sequence length fed to the LSTM
+MAX_TOKENS = 50
+
+# Training samples kept by the Recommender; once full, the oldest are overwritten
+TRAINING_BUFFER_CAPACITY = 10000
+
+# Distinct code prefixes memoized per Recommender before the cache is reset
+TOKEN_CACHE_SIZE = 4096
+
+# Code argument: source text, or an ID returned by Recommender.register_code
+CodeRef = Union[str, int]
+
+
 class Recommender(nn.Module):
     """
     The Overseer that predicts code quality (TrustScore) using a lightweight neural network.
@@ -24,7 +37,8 @@ class Recommender(nn.Module):
         embedding_dim: int = 64,
         hidden_dim: int = 128,
         num_agents: int = 100,
-        learning_rate: float = 0.001
+        learning_rate: float = 0.001,
+        buffer_capacity: int = TRAINING_BUFFER_CAPACITY
     ):
         """
         Initialize the Recommender model.
@@ -35,6 +49,7 @@ class Recommender(nn.Module):
             hidden_dim: Hidden layer dimension
             num_agents: Number of agents to track
             learning_rate: Learning rate for optimizer
+            buffer_capacity: Training samples kept before the oldest are overwritten
         """
         super(Recommender, self).__init__()
         
@@ -61,90 +76,246 @@ class Recommender(nn.Module):
             nn.Sigmoid()  # Output between 0 and 1
         )
         
-        # Training components
-        self.optimizer = optim.Adam(self.parameters(), lr=learning_rate)
+        # Training components (the optimizer is built on first use; see the optimizer property)
+        self.learning_rate = learning_rate
+        self._optimizer = None
         self.criterion = nn.BCELoss()
         
-        # Training history
-        self.training_buffer: List[Tuple[int, List[int], float]] = []
+        # Training history: a fixed-capacity ring buffer stored as parallel arrays
+        # (agent embedding index, token IDs, label); num_samples counts the filled slots
+        self.buffer_capacity = buffer_capacity
+        self._buf_agents = np.zeros(buffer_capacity, dtype=np.int32)
+        self._buf_tokens = np.zeros((buffer_capacity, MAX_TOKENS), dtype=np.int32)
+        self._buf_labels = np.zeros(buffer_capacity, dtype=np.float32)
+        self._buf_head = 0
+        self.num_samples = 0
         self.step_count = 0
         self.total_loss = 0.0
         
-    def _tokenize_code(self, code: str) -> List[int]:
+        # Minibatch sampler, seeded from the global NumPy RNG so np.random.seed() still
+        # makes runs reproducible
+        self._rng = np.random.default_rng(np.random.randint(2**31 - 1))
+        
+        # Tokenization memo: code prefix -> token IDs (see _tokenize_code)
+        self._token_cache: Dict[str, np.ndarray] = {}
+        
+        # Codes interned by register_code: code -> ID, and ID -> token IDs
+        self._registered_ids: Dict[str, int] = {}
+        self._registered_tokens: List[np.ndarray] = []
+        
+        # Inference mode by default; update() switches to train mode only while it trains
+        self.eval()
+        
+    @property
+    def optimizer(self) -> optim.Optimizer:
+        """
+        Adam optimizer over the model parameters, created on first access.
+        
+        Constructing the first torch optimizer in a process imports torch._dynamo
+        (over a second of startup), which predict-only users never need.
+        """
+        if self._optimizer is None:
+            self._optimizer = optim.Adam(self.parameters(), lr=self.learning_rate)
+        return self._optimizer
+    
+    def _tokenize_code(self, code: CodeRef) -> np.ndarray:
         """
         Simple tokenization of code into integer tokens.
         In production, use proper tokenizer (e.g., from transformers).
         
+        Only the first MAX_TOKENS characters reach the output, so results are
+        memoized per instance keyed on that prefix; agents resubmit near-identical
+        code every step. Codes interned with register_code are a list index.
+        
+        Args:
+            code: Source code string, or a code ID returned by register_code
+            
+        Returns:
+            int64 array of MAX_TOKENS token IDs (shared with the memo; do not mutate)
+        """
+        if not isinstance(code, str):
+            return self._registered_tokens[code]
+        
+        key = code[:MAX_TOKENS]
+        tokens = self._token_cache.get(key)
+        if tokens is None:
+            if len(self._token_cache) >= TOKEN_CACHE_SIZE:
+                self._token_cache.clear()
+            tokens = self._token_cache[key] = self._tokenize_prefix(key)
+        return tokens
+    
+    def register_code(self, code: str) -> int:
+        """
+        Intern a code sample's tokens and return an ID usable in place of the code.
+        
+        Callers that score or train on the same samples repeatedly can tokenize
+        them once up front; registering the same code twice returns the same ID.
+        
         Args:
             code: Source code string
             
         Returns:
-            List of token IDs
-        """
-        # Simple character-based tokenization with hash
-        tokens = []
-        for char in code[:100]:  # Limit length
-            token_id = hash(char) % self.vocab_size
-            tokens.append(token_id)
-        
-        # Pad/truncate to fixed length
-        max_len = 50
-        if len(tokens) < max_len:
-            tokens.extend([0] * (max_len - len(tokens)))
-        else:
-            tokens = tokens[:max_len]
+            Code ID accepted wherever these methods take code
+        """
+        code_id = self._registered_ids.get(code)
+        if code_id is None:
+            code_id = self._registered_ids[code] = len(self._registered_tokens)
+            self._registered_tokens.append(self._tokenize_code(code))
+        return code_id
+    
+    def _tokenize_prefix(self, prefix: str) -> np.ndarray:
+        """
+        Tokenize up to MAX_TOKENS characters, zero-padded to MAX_TOKENS.
+        
+        Each character's token is its code point modulo vocab_size, computed for
+        the whole prefix at once from its UTF-32 encoding (one 4-byte unit per
+        character).
+        
+        Args:
+            prefix: Leading characters of the code
             
+        Returns:
+            int64 array of token IDs
+        """
+        code_points = np.frombuffer(prefix.encode('utf-32-le'), dtype=np.uint32)
+        tokens = np.zeros(MAX_TOKENS, dtype=np.int64)
+        np.remainder(code_points, self.vocab_size, out=tokens[:code_points.size], casting='unsafe')
         return tokens
     
-    def predict(self, agent_id: int, code: str) -> float:
+    def _token_batch(self, codes: Sequence[CodeRef]) -> torch.Tensor:
+        """
+        Tokenize several codes into one [batch, MAX_TOKENS] LongTensor.
+        
+        Rows are copied from the tokenizer memo into a single preallocated int64
+        buffer, which the tensor then shares without another copy.
+        
+        Args:
+            codes: Source code strings (or register_code IDs)
+            
+        Returns:
+            Token ID tensor [len(codes), MAX_TOKENS]
+        """
+        buf = np.empty((len(codes), MAX_TOKENS), dtype=np.int64)
+        for row, code in zip(buf, codes):
+            row[:] = self._tokenize_code(code)
+        return torch.from_numpy(buf)
+    
+    def _features(self, agent_tensor: torch.Tensor, code_tensor: torch.Tensor) -> torch.Tensor:
+        """
+        Shared forward pass up to the trust predictor's input.
+        
+        Args:
+            agent_tensor: Agent indices [batch] (already reduced modulo num_agents)
+            code_tensor: Token IDs [batch, seq_len]
+            
+        Returns:
+            Combined LSTM output + agent embedding [batch, hidden_dim + embedding_dim]
+        """
+        agent_emb = self.agent_embedding(agent_tensor)  # [batch, embedding_dim]
+        code_emb = self.code_embedding(code_tensor)  # [batch, seq_len, embedding_dim]
+        lstm_out, _ = self.lstm(code_emb)  # [batch, seq_len, hidden_dim]
+        lstm_last = lstm_out[:, -1, :]  # [batch, hidden_dim]
+        return torch.cat([lstm_last, agent_emb], dim=1)
+    
+    def predict(self, agent_id: int, code: CodeRef) -> float:
         """
         Predict trust score for an agent's code.
         
         Args:
             agent_id: ID of the agent
-            code: Source code to evaluate
+            code: Source code to evaluate (or its register_code ID)
             
         Returns:
             Trust score between 0 and 1
         """
-        self.eval()
-        
-        with torch.no_grad():
+        with torch.inference_mode():
             # Tokenize code
-            code_tokens = self._tokenize_code(code)
-            code_tensor = torch.tensor([code_tokens], dtype=torch.long)
-            
-            # Agent embedding
+            code_tensor = torch.from_numpy(self._tokenize_code(code)).unsqueeze(0)
             agent_tensor = torch.tensor([agent_id % self.num_agents], dtype=torch.long)
-            agent_emb = self.agent_embedding(agent_tensor)  # [1, embedding_dim]
             
-            # Code embedding
-            code_emb = self.code_embedding(code_tensor)  # [1, seq_len, embedding_dim]
-            
-            # LSTM processing
-            lstm_out, _ = self.lstm(code_emb)  # [1, seq_len, hidden_dim]
-            lstm_last = lstm_out[:, -1, :]  # [1, hidden_dim]
-            
-            # Concatenate agent and code features
-            combined = torch.cat([lstm_last, agent_emb], dim=1)
+            # Agent and code features
+            combined = self._features(agent_tensor, code_tensor)
             
             # Predict trust score
             trust_score = self.trust_predictor(combined)
             
         return trust_score.item()
     
-    def add_training_sample(self, agent_id: int, code: str, passed: bool):
+    def predict_batch(self, agent_id: Union[int, Sequence[int]], codes: Sequence[CodeRef]) -> np.ndarray:
+        """
+        Predict trust scores for several code samples in one forward pass.
+        
+        Args:
+            agent_id: ID of the agent shared by all samples, or one ID per sample
+            codes: Source code strings (or register_code IDs) to evaluate
+            
+        Returns:
+            Array of trust scores between 0 and 1, one per code sample
+        """
+        with torch.inference_mode():
+            # Tokenize all codes into one [batch, seq_len] tensor
+            code_tensor = self._token_batch(codes)
+            
+            # Agent indices: broadcast a single ID, or reduce each given ID
+            if isinstance(agent_id, (int, np.integer)):
+                agent_tensor = torch.full((len(codes),), agent_id % self.num_agents, dtype=torch.long)
+            else:
+                agent_ids = np.fromiter(agent_id, dtype=np.int64, count=len(agent_id))
+                agent_tensor = torch.from_numpy(agent_ids % self.num_agents)
+            combined = self._features(agent_tensor, code_tensor)
+            
+            # Predict trust scores
+            trust_scores = self.trust_predictor(combined)
+            
+        return trust_scores.squeeze(1).numpy()
+    
+    def add_training_sample(self, agent_id: int, code: CodeRef, passed: bool):
         """
-        Add a training sample to the buffer.
+        Add a training sample to the buffer, overwriting the oldest once it is full.
         
         Args:
             agent_id: ID of the agent
-            code: Source code
+            code: Source code (or its register_code ID)
             passed: Whether the code passed tests (1.0) or failed (0.0)
         """
-        code_tokens = self._tokenize_code(code)
-        label = 1.0 if passed else 0.0
-        self.training_buffer.append((agent_id, code_tokens, label))
+        slot = self._buf_head
+        self._buf_agents[slot] = agent_id % self.num_agents
+        self._buf_tokens[slot] = self._tokenize_code(code)
+        self._buf_labels[slot] = 1.0 if passed else 0.0
+        
+        self._buf_head = (slot + 1) % self.buffer_capacity
+        self.num_samples = min(self.num_samples + 1, self.buffer_capacity)
+    
+    def add_training_samples(self, samples: Sequence[Tuple[int, CodeRef, bool]]):
+        """
+        Add several training samples at once, in order.
+        
+        Same result as calling add_training_sample for each sample, but agent
+        indices and labels are written with one vectorized assignment each.
+        
+        Args:
+            samples: (agent_id, code, passed) tuples, as for add_training_sample
+        """
+        if not samples:
+            return
+        
+        # Samples beyond capacity would overwrite each other; only the newest survive
+        skip = max(0, len(samples) - self.buffer_capacity)
+        if skip:
+            self._buf_head = (self._buf_head + skip) % self.buffer_capacity
+            samples = samples[skip:]
+        
+        count = len(samples)
+        agent_ids, codes, passed = zip(*samples)
+        slots = (self._buf_head + np.arange(count)) % self.buffer_capacity
+        
+        self._buf_agents[slots] = np.fromiter(agent_ids, dtype=np.int64, count=count) % self.num_agents
+        for slot, code in zip(slots, codes):
+            self._buf_tokens[slot] = self._tokenize_code(code)
+        self._buf_labels[slots] = np.fromiter(passed, dtype=np.float32, count=count)
+        
+        self._buf_head = (self._buf_head + count) % self.buffer_capacity
+        self.num_samples = min(self.num_samples + count + skip, self.buffer_capacity)
     
     def update(self, batch_size: int = 32) -> float:
         """
@@ -157,26 +328,21 @@ class Recommender(nn.Module):
         Returns:
             Average loss over training
         """
-        if len(self.training_buffer) < batch_size:
+        if self.num_samples < batch_size:
             return 0.0  # Not enough samples yet
         
         self.train()
         
-        # Sample a batch
-        indices = np.random.choice(len(self.training_buffer), batch_size, replace=False)
-        batch = [self.training_buffer[i] for i in indices]
+        # Sample a batch (shuffle=False: O(batch_size) draws instead of permuting the buffer)
+        indices = self._rng.choice(self.num_samples, batch_size, replace=False, shuffle=False)
         
-        # Prepare batch tensors
-        agent_ids = torch.tensor([item[0] % self.num_agents for item in batch], dtype=torch.long)
-        code_tokens = torch.tensor([item[1] for item in batch], dtype=torch.long)
-        labels = torch.tensor([item[2] for item in batch], dtype=torch.float32).unsqueeze(1)
+        # Prepare batch tensors: one fancy-index gather per buffer column
+        agent_ids = torch.from_numpy(self._buf_agents[indices]).long()
+        code_tokens = torch.from_numpy(self._buf_tokens[indices]).long()
+        labels = torch.from_numpy(self._buf_labels[indices]).unsqueeze(1)
         
         # Forward pass
-        agent_emb = self.agent_embedding(agent_ids)
-        code_emb = self.code_embedding(code_tokens)
-        lstm_out, _ = self.lstm(code_emb)
-        lstm_last = lstm_out[:, -1, :]
-        combined = torch.cat([lstm_last, agent_emb], dim=1)
+        combined = self._features(agent_ids, code_tokens)
         predictions = self.trust_predictor(combined)
         
         # Compute loss
@@ -187,10 +353,13 @@ class Recommender(nn.Module):
         loss.backward()
         self.optimizer.step()
         
-        self.total_loss += loss.item()
+        self.eval()
+        
+        loss_value = loss.item()
+        self.total_loss += loss_value
         self.step_count += 1
         
-        return loss.item()
+        return loss_value
     
     def get_top_k_agents(
         self,
@@ -209,16 +378,20 @@ class Recommender(nn.Module):
         Returns:
             List of (agent_id, trust_score) tuples, sorted descending
         """
-        scores = []
+        if not agent_ids or k <= 0:
+            return []
         
-        for agent_id, code in zip(agent_ids, code_samples):
-            score = self.predict(agent_id, code)
-            scores.append((agent_id, score))
+        # One forward pass for all candidates
+        scores = self.predict_batch(list(agent_ids), list(code_samples))
         
-        # Sort by score descending
-        scores.sort(key=lambda x: x[1], reverse=True)
+        # Keep every candidate tied with the k-th best score (argpartition is O(N)),
+        # then stable-sort just those so ties keep their input order
+        k = min(k, len(scores))
+        kth_score = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        candidates = np.flatnonzero(scores >= kth_score)
+        top = candidates[np.argsort(-scores[candidates], kind="stable")[:k]]
         
-        return scores[:k]
+        return [(agent_ids[i], float(scores[i])) for i in top]
     
     def get_stats(self) -> Dict:
         """
@@ -230,7 +403,7 @@ class Recommender(nn.Module):
         avg_loss = self.total_loss / self.step_count if self.step_count > 0 else 0.0
         
         return {
-            'training_samples': len(self.training_buffer),
+            'training_samples': self.num_samples,
             'training_steps': self.step_count,
             'average_loss': avg_loss
         }
@@ -246,26 +419,14 @@ class Recommender(nn.Module):
         Returns:
             Tensor of activations (combined LSTM output + agent embedding)
         """
-        self.eval()
-        
+        # no_grad, not inference_mode: callers such as SteeringMechanism keep these tensors
         with torch.no_grad():
             # Tokenize code
-            code_tokens = self._tokenize_code(code)
-            code_tensor = torch.tensor([code_tokens], dtype=torch.long)
-            
-            # Agent embedding
+            code_tensor = torch.from_numpy(self._tokenize_code(code)).unsqueeze(0)
             agent_tensor = torch.tensor([agent_id % self.num_agents], dtype=torch.long)
-            agent_emb = self.agent_embedding(agent_tensor)
-            
-            # Code embedding
-            code_emb = self.code_embedding(code_tensor)
-            
-            # LSTM processing
-            lstm_out, _ = self.lstm(code_emb)
-            lstm_last = lstm_out[:, -1, :]
             
             # Combined features (this is what goes into trust_predictor)
-            combined = torch.cat([lstm_last, agent_emb], dim=1)
+            combined = self._features(agent_tensor, code_tensor)
             
         return combined
     
@@ -280,26 +441,14 @@ class Recommender(nn.Module):
         Returns:
             Tensor of activations [batch_size, hidden_dim + embedding_dim]
         """
-        self.eval()
-        
         with torch.no_grad():
             # Tokenize all codes
-            all_tokens = [self._tokenize_code(code) for code in codes]
-            code_tensor = torch.tensor(all_tokens, dtype=torch.long)
+            code_tensor = self._token_batch(codes)
             
             # Agent embedding (same for all)
-            batch_size = len(codes)
-            agent_tensor = torch.tensor([agent_id % self.num_agents] * batch_size, dtype=torch.long)
-            agent_emb = self.agent_embedding(agent_tensor)
-            
-            # Code embedding
-            code_emb = self.code_embedding(code_tensor)
-            
-            # LSTM processing
-            lstm_out, _ = self.lstm(code_emb)
-            lstm_last = lstm_out[:, -1, :]
+            agent_tensor = torch.full((len(codes),), agent_id % self.num_agents, dtype=torch.long)
             
             # Combined features
-            combined = torch.cat([lstm_last, agent_emb], dim=1)
+            combined = self._features(agent_tensor, code_tensor)
             
         return combined
@@ -26,6 +26,12 @@ class SteeringMechanism:
         self.hook_handle = None
         self.steering_coefficient = 1.0
         
+        # steering_coefficient * collusion_vector, set while steering is applied
+        self._scaled_vector: Optional[torch.Tensor] = None
+        
+        # Output buffer reused by the hook for inference-only forward passes
+        self._scratch: Optional[torch.Tensor] = None
+        
     def compute_collusion_vector(
         self,
         recommender,
@@ -44,62 +50,70 @@ class SteeringMechanism:
         Returns:
             The computed collusion vector
         """
-        # Get activations for both sets
-        snake_activations = recommender.get_activations_batch(snake_codes)
-        neutral_activations = recommender.get_activations_batch(neutral_codes)
+        # Get activations for both sets in one batched forward pass
+        activations = recommender.get_activations_batch(list(snake_codes) + list(neutral_codes))
+        num_snake = len(snake_codes)
         
         # Compute mean activations
-        snake_mean = snake_activations.mean(dim=0)
-        neutral_mean = neutral_activations.mean(dim=0)
+        snake_mean = activations[:num_snake].mean(dim=0)
+        neutral_mean = activations[num_snake:].mean(dim=0)
         
         # Collusion vector = snake_mean - neutral_mean
         # This captures what makes snake_case "different" from neutral
         self.collusion_vector = snake_mean - neutral_mean
         
+        # An active hook picks up the new vector, scaled once here
+        if self.hook_handle is not None:
+            self._scaled_vector = self._scale_vector(recommender, self.steering_coefficient)
+        
         return self.collusion_vector
     
-    def _create_steering_hook(self, coefficient: float) -> Callable:
+    def _scale_vector(self, recommender, coefficient: float) -> torch.Tensor:
         """
-        Create a forward hook that subtracts the collusion vector.
+        Scale the collusion vector for the steering hook.
+        
+        The result is cast to trust_predictor's parameter dtype and device, so
+        the hook's subtraction never converts it per forward pass.
         
         Args:
+            recommender: The Recommender model
             coefficient: Scaling factor for the steering intervention
             
         Returns:
-            Hook function
+            coefficient * collusion_vector, contiguous
         """
-        def hook(module, input_tuple, output):
-            # Input to trust_predictor is the combined activation
-            # We modify the input before it goes through the layers
-            if self.collusion_vector is not None:
-                # Subtract the collusion vector from input
-                modified_input = input_tuple[0] - (coefficient * self.collusion_vector)
-                
-                # Re-run the forward pass with modified input
-                with torch.no_grad():
-                    modified_output = module(modified_input)
-                
-                return modified_output
-            return output
-        
-        return hook
+        param = next(recommender.trust_predictor.parameters())
+        scaled = coefficient * self.collusion_vector
+        return scaled.to(device=param.device, dtype=param.dtype).contiguous()
     
-    def _create_input_hook(self, coefficient: float) -> Callable:
+    def _create_input_hook(self) -> Callable:
         """
         Create a forward pre-hook that modifies input before the layer.
         
-        Args:
-            coefficient: Scaling factor for the steering intervention
-            
+        Steering rewrites the input rather than re-running the module from a
+        forward hook, so each steered forward pass computes trust_predictor once.
+        The scaled vector is precomputed by apply_steering. Without autograd the
+        result is written into a reused scratch buffer (trust_predictor does not keep
+        its input); when gradients are enabled, as in Recommender.update, a fresh
+        tensor is allocated so autograd can save it.
+        
         Returns:
             Pre-hook function
         """
         def pre_hook(module, input_tuple):
-            if self.collusion_vector is not None and len(input_tuple) > 0:
-                # Subtract the collusion vector from input
+            scaled_vector = self._scaled_vector
+            if scaled_vector is not None and len(input_tuple) > 0:
+                # Subtract the precomputed scaled collusion vector from input
                 input_tensor = input_tuple[0]
-                modified_input = input_tensor - (coefficient * self.collusion_vector)
-                return (modified_input,)
+                if torch.is_grad_enabled():
+                    return (input_tensor - scaled_vector,)
+                
+                scratch = self._scratch
+                if (scratch is None or scratch.shape != input_tensor.shape
+                        or scratch.dtype != input_tensor.dtype or scratch.is_inference() != input_tensor.is_inference()):
+                    scratch = self._scratch = torch.empty_like(input_tensor)
+                torch.sub(input_tensor, scaled_vector, out=scratch)
+                return (scratch,)
             return input_tuple
         
         return pre_hook
@@ -122,9 +136,10 @@ class SteeringMechanism:
         self.reset_steering(recommender)
         
         self.steering_coefficient = coefficient
+        self._scaled_vector = self._scale_vector(recommender, coefficient)
         
         # Register pre-hook on trust_predictor
-        hook_fn = self._create_input_hook(coefficient)
+        hook_fn = self._create_input_hook()
         self.hook_handle = recommender.trust_predictor.register_forward_pre_hook(hook_fn)
         
     def reset_steering(self, recommender):
@@ -137,6 +152,8 @@ class SteeringMechanism:
         if self.hook_handle is not None:
             self.hook_handle.remove()
             self.hook_handle = None
+        self._scaled_vector = None
+        self._scratch = None
     
     def get_collusion_vector_stats(self) -> dict:
         """
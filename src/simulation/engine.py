@@ -7,8 +7,14 @@ evaluation, and evolution cycles.
 """
 
 from typing import List, Dict, Optional
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+import heapq
 import random
 
+import numpy as np
+
 from simulation.environment import SharedRepository, Commit
 from agents.base_worker import BaseWorker
 from overseer.recommender import Recommender
@@ -27,7 +33,8 @@ class SimulationEngine:
         agents: List[BaseWorker],
         recommender: Recommender,
         top_k: int = 5,
-        observation_window: int = 10
+        observation_window: int = 10,
+        parallel_threshold: int = 50
     ):
         """
         Initialize the simulation engine.
@@ -38,12 +45,18 @@ class SimulationEngine:
             recommender: The Recommender (Overseer)
             top_k: Number of agents to select each step
             observation_window: Number of recent commits to observe
+            parallel_threshold: Generate code on a thread pool once this many agents are
+                selected in a step (smaller steps stay sequential)
         """
         self.repository = repository
         self.agents = agents
         self.recommender = recommender
         self.top_k = top_k
         self.observation_window = observation_window
+        self.parallel_threshold = parallel_threshold
+        
+        # Created on first use by _generate_parallel
+        self._pool: Optional[ThreadPoolExecutor] = None
         
         # Evolutionary selector
         self.evolver = Evolver()
@@ -52,8 +65,12 @@ class SimulationEngine:
         self.step_count = 0
         self.next_agent_id = len(agents)
         
-        # Sample tasks for agents
-        self.task_pool = [
+        # Population style counts; styles only change when evolve() replaces agents
+        self.style_counts: Counter = Counter()
+        self.refresh_style_counts()
+        
+        # Sample tasks for agents (fixed, so a tuple)
+        self.task_pool = (
             "Implement a sorting algorithm",
             "Write a function to parse JSON",
             "Create a binary search tree",
@@ -64,7 +81,7 @@ class SimulationEngine:
             "Write a function to validate parentheses",
             "Create a queue using stacks",
             "Implement merge sort"
-        ]
+        )
     
     def step(self) -> Dict:
         """
@@ -79,7 +96,7 @@ class SimulationEngine:
         6. Training: Update recommender (every 50 steps)
         
         Returns:
-            Dictionary with step statistics
+            Dictionary with step statistics (new_commits holds the Commit objects submitted this step)
         """
         self.step_count += 1
         
@@ -92,41 +109,44 @@ class SimulationEngine:
         # Use last known code or placeholder for new agents
         agent_codes = []
         for agent in self.agents:
-            if agent.memory:
-                last_code = agent.memory[-1]['code'] if isinstance(agent.memory[-1], dict) else ""
-            else:
-                last_code = "# No history yet"
-            agent_codes.append(last_code)
+            last_code = agent.last_memory_code
+            agent_codes.append("# No history yet" if last_code is None else last_code)
         
-        # Get agent IDs (hash worker_id to integer)
-        agent_ids = [hash(agent.worker_id) for agent in self.agents]
+        # Get agent IDs (worker_id hashed to an integer, cached on each agent)
+        agent_ids = [agent.id_hash for agent in self.agents]
         
         # Select top-K agents
         top_agents_info = self.recommender.get_top_k_agents(agent_ids, agent_codes, self.top_k)
-        top_indices = []
-        for agent_id, _ in top_agents_info:
-            # Find agent index by matching hashed ID
-            for i, agent in enumerate(self.agents):
-                if hash(agent.worker_id) == agent_id:
-                    top_indices.append(i)
-                    break
+        
+        # Map hashed IDs back to agent indices (first agent wins on a collision). Built
+        # per step because callers may replace agents between steps (e.g. evolution)
+        index_of = {}
+        for i, agent_id in enumerate(agent_ids):
+            index_of.setdefault(agent_id, i)
+        top_indices = [index_of[agent_id] for agent_id, _ in top_agents_info]
         
         # --- 3. ACTION ---
         # Selected agents generate code
         step_results = []
-        for idx in top_indices[:self.top_k]:  # Ensure we don't exceed top_k
+        new_commits = []
+        training_samples = []
+        selected = top_indices[:self.top_k]  # Ensure we don't exceed top_k
+        
+        # Select a random task for every selected agent in one draw
+        tasks = random.choices(self.task_pool, k=len(selected))
+        codes = self._generate_parallel(selected, tasks) if len(selected) >= self.parallel_threshold else None
+        for n, idx in enumerate(selected):
             agent = self.agents[idx]
-            
-            # Select random task
-            task = random.choice(self.task_pool)
+            task = tasks[n]
             
             # Generate code
-            code = agent.generate_code(task)
+            code = agent.generate_code(task) if codes is None else codes[n]
             
             # --- 4. EVALUATION ---
             # Submit to repository
-            commit = Commit(author=agent.worker_id, code=code)
+            commit = Commit(author=agent.worker_id, code=code, style=agent.last_code_style, agent_index=idx)
             self.repository.submit_commit(commit)
+            new_commits.append(commit)
             
             # Simulate test pass/fail (for demo, use random with bias toward success)
             # In real implementation, would actually run tests
@@ -140,8 +160,8 @@ class SimulationEngine:
                 agent.spend_credits(1.0)
                 agent.update_memory(code, success=False, task=task)
             
-            # Add to recommender training buffer
-            self.recommender.add_training_sample(hash(agent.worker_id), code, passed)
+            # Queue for the recommender training buffer (added once per step below)
+            training_samples.append((agent_ids[idx], code, passed))
             
             step_results.append({
                 'agent_id': agent.worker_id,
@@ -150,6 +170,8 @@ class SimulationEngine:
                 'credits': agent.credits
             })
         
+        self.recommender.add_training_samples(training_samples)
+        
         # --- 6. TRAINING ---
         # Update recommender every 50 steps
         training_loss = 0.0
@@ -161,11 +183,38 @@ class SimulationEngine:
             'step': self.step_count,
             'selected_agents': len(top_indices),
             'results': step_results,
+            'new_commits': new_commits,
             'training_loss': training_loss,
             'repository_utility': self.repository.get_global_utility(),
             'total_agents': len(self.agents)
         }
     
+    def _generate_parallel(self, selected: List[int], tasks: List[str]) -> List[str]:
+        """
+        Generate code for the selected agents on a thread pool.
+        
+        Code generation only touches the generating agent, so agents can run
+        concurrently; repository submission, rewards and training samples stay in
+        step()'s sequential loop.
+        
+        Args:
+            selected: Indices of the agents selected this step
+            tasks: Task for each selected agent, in order
+            
+        Returns:
+            Generated code for each selected agent, in order
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor()
+        
+        return list(self._pool.map(lambda idx, task: self.agents[idx].generate_code(task), selected, tasks))
+    
+    def close(self):
+        """Shut down the code-generation thread pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+    
     def evolve(self) -> Dict:
         """
         Execute evolutionary selection using the Evolver.
@@ -179,24 +228,55 @@ class SimulationEngine:
         Returns:
             Dictionary with evolution statistics including style distribution
         """
-        return self.evolver.evolve_population(self.agents)
+        evolution_result = self.evolver.evolve_population(self.agents)
+        self.refresh_style_counts()
+        return evolution_result
     
-    def run(self, num_steps: int) -> List[Dict]:
+    def refresh_style_counts(self) -> Counter:
+        """
+        Recount agent styles into self.style_counts.
+        
+        evolve() calls this itself; callers that change styles or replace
+        agents directly should call it afterwards.
+        
+        Returns:
+            The updated style counts
+        """
+        self.style_counts = Counter(agent.preferred_style for agent in self.agents)
+        return self.style_counts
+    
+    def run(self, num_steps: int) -> Dict:
         """
         Run the simulation for a specified number of steps.
         
+        Per-step scalars are written by index into preallocated columns rather
+        than collected as one result dict per step.
+        
         Args:
             num_steps: Number of simulation steps to execute
             
         Returns:
-            List of step results
+            Columnar step results: ndarrays 'step', 'selected_agents', 'training_loss',
+            'repository_utility', 'total_agents' and 'evolution_mask' (one entry per step),
+            'evolution' mapping step number -> evolution statistics, and the
+            'evolution_count' total tallied during the loop
         """
-        results = []
+        results = {
+            'step': np.empty(num_steps, dtype=np.int64),
+            'selected_agents': np.empty(num_steps, dtype=np.int64),
+            'training_loss': np.empty(num_steps, dtype=np.float64),
+            'repository_utility': np.empty(num_steps, dtype=np.float64),
+            'total_agents': np.empty(num_steps, dtype=np.int64),
+            'evolution_mask': np.zeros(num_steps, dtype=bool),
+            'evolution': {},
+            'evolution_count': 0
+        }
         
         for i in range(num_steps):
             # Execute step
             step_result = self.step()
-            results.append(step_result)
+            for column in ('step', 'selected_agents', 'training_loss', 'repository_utility', 'total_agents'):
+                results[column][i] = step_result[column]
             
             # Apply drift to repository (every 20 steps)
             if self.step_count % 20 == 0:
@@ -204,8 +284,9 @@ class SimulationEngine:
             
             # Trigger evolution every 100 steps
             if self.step_count % 100 == 0:
-                evolution_result = self.evolve()
-                results[-1]['evolution'] = evolution_result
+                results['evolution'][self.step_count] = self.evolve()
+                results['evolution_mask'][i] = True
+                results['evolution_count'] += 1
         
         return results
     
@@ -216,13 +297,15 @@ class SimulationEngine:
         Returns:
             Dictionary of statistics
         """
-        agent_stats = [agent.get_stats() for agent in self.agents]
+        # nlargest matches sorted(..., reverse=True)[:5] (ties included) without a full
+        # sort; only those five agents build a full stats dict
+        top_agents = heapq.nlargest(5, self.agents, key=attrgetter('credits'))
         
         return {
             'step_count': self.step_count,
             'num_agents': len(self.agents),
             'repository_state': self.repository.get_state_summary(),
             'recommender_stats': self.recommender.get_stats(),
-            'agent_credits': {a['worker_id']: a['current_credits'] for a in agent_stats},
-            'top_agents': sorted(agent_stats, key=lambda x: x['current_credits'], reverse=True)[:5]
+            'agent_credits': {agent.worker_id: agent.credits for agent in self.agents},
+            'top_agents': [agent.get_stats() for agent in top_agents]
         }
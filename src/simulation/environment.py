@@ -6,19 +6,37 @@ It tracks commits, global utility, test suites, and code drift.
 """
 
 from dataclasses import dataclass, field
-from typing import List, Optional, Callable
+from typing import List, Optional, Callable, Deque, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import random
 from datetime import datetime
 
 
-@dataclass
+# Commits kept in SharedRepository.commits; older ones are dropped
+MAX_COMMIT_HISTORY = 10000
+
+
+def _run_test(test: Callable) -> bool:
+    """Run one test callable; True if it returned without raising."""
+    try:
+        test()
+        return True
+    except Exception:
+        return False
+
+
+@dataclass(slots=True)
 class Commit:
-    """Represents a code commit in the repository."""
+    """Represents a code commit in the repository (slotted: no per-instance __dict__)."""
     author: str
     code: str
     timestamp: datetime = field(default_factory=datetime.now)
     parent_id: Optional[int] = None
     commit_id: Optional[int] = None
+    style: Optional[str] = None  # Detected code style, if the author already knows it
+    agent_index: int = -1  # Author's position in the engine's agent list (-1 = unknown)
 
 
 class SharedRepository:
@@ -27,14 +45,24 @@ class SharedRepository:
     and test suites. Implements drift to simulate code deprecation over time.
     """
     
-    def __init__(self):
-        """Initialize an empty repository with zero utility and minimal test suite."""
-        self.commits: List[Commit] = []
+    def __init__(self, max_history: int = MAX_COMMIT_HISTORY):
+        """
+        Initialize an empty repository with zero utility and minimal test suite.
+        
+        Args:
+            max_history: Most recent commits to keep (commit IDs keep counting past it)
+        """
+        self.commits: Deque[Commit] = deque(maxlen=max_history)
         self.global_utility: float = 0.0
         self.test_suite: List[Callable] = []
         self._next_commit_id = 0
         self._drift_factor = 0.05  # 5% chance per drift cycle to break a test
         
+        # Test results reused by get_state_summary until the repository changes;
+        # _test_version is bumped when the suite is edited or drift is applied
+        self._test_version = 0
+        self._test_cache: Optional[Tuple[tuple, dict]] = None
+        
     def submit_commit(self, commit: Commit) -> bool:
         """
         Submit a new commit to the repository.
@@ -76,12 +104,12 @@ class SharedRepository:
             limit: Maximum number of recent commits to return
             
         Returns:
-            List of commits (most recent first)
+            List of commits (most recent first, at most max_history)
         """
-        commits = list(reversed(self.commits))
+        # Walk back from the newest commit without copying the whole history
         if limit:
-            return commits[:limit]
-        return commits
+            return list(islice(reversed(self.commits), limit))
+        return list(reversed(self.commits))
     
     def update_test_suite(self, test: Callable, add: bool = True):
         """
@@ -91,35 +119,53 @@ class SharedRepository:
             test: The test function to add/remove
             add: If True, add the test; if False, remove it
         """
+        self._test_version += 1
         if add:
             self.test_suite.append(test)
         else:
             if test in self.test_suite:
                 self.test_suite.remove(test)
     
-    def run_tests(self) -> dict:
+    def run_tests(self, max_workers: Optional[int] = None) -> dict:
         """
         Run all tests in the test suite.
         
+        Args:
+            max_workers: Run the tests concurrently on this many threads, for suites of
+                thread-safe, I/O-bound tests (None = one after another, in order)
+        
         Returns:
             dict: Results with 'passed', 'failed', and 'total' counts
         """
-        passed = 0
-        failed = 0
-        
-        for test in self.test_suite:
-            try:
-                test()
-                passed += 1
-            except Exception:
-                failed += 1
+        tests = list(self.test_suite)
+        if max_workers and len(tests) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                passed = sum(pool.map(_run_test, tests))
+        else:
+            passed = sum(map(_run_test, tests))
         
         return {
             'passed': passed,
-            'failed': failed,
-            'total': len(self.test_suite)
+            'failed': len(tests) - passed,
+            'total': len(tests)
         }
     
+    def _cached_test_results(self) -> dict:
+        """
+        Run the test suite, or reuse the last results if nothing has changed since.
+        
+        The results are keyed on the commit counter, the suite version and the
+        suite size, so commits, update_test_suite, drift and direct appends to
+        test_suite all trigger a fresh run.
+        
+        Returns:
+            dict: Results as returned by run_tests
+        """
+        key = (self._next_commit_id, self._test_version, len(self.test_suite))
+        if self._test_cache is None or self._test_cache[0] != key:
+            self._test_cache = (key, self.run_tests())
+        return self._test_cache[1]
+    
     def apply_drift(self) -> dict:
         """
         Apply code drift - randomly deprecate old code by breaking tests.
@@ -130,6 +176,7 @@ class SharedRepository:
         """
         tests_broken = 0
         utility_lost = 0.0
+        self._test_version += 1
         
         # Randomly break some tests
         for i, test in enumerate(self.test_suite):
@@ -155,10 +202,10 @@ class SharedRepository:
         Returns:
             dict: Summary including commit count, utility, and test stats
         """
-        test_results = self.run_tests()
+        test_results = self._cached_test_results()
         
         return {
-            'total_commits': len(self.commits),
+            'total_commits': self._next_commit_id,
             'global_utility': self.global_utility,
             'test_suite_size': len(self.test_suite),
             'tests_passing': test_results['passed'],
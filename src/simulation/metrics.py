@@ -5,7 +5,11 @@ This module provides metrics for quantifying how far the agent economy
 is from "perfect honesty" (where all agents use neutral style).
 """
 
-from typing import List, TYPE_CHECKING
+from typing import List, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from agents.channels import STYLES, STYLE_INDEX
 
 if TYPE_CHECKING:
     from agents.base_worker import BaseWorker
@@ -32,20 +36,43 @@ class NashMetrics:
             - D = 0.0: Perfect Honesty (everyone is neutral)
             - D = 1.0: Total Corruption (everyone is signaling)
         """
-        if not agents:
-            return 0.0
-        
-        # Count neutral agents (honest agents)
-        neutral_count = sum(1 for agent in agents if agent.preferred_style == "neutral")
+        # Nash Distance = 1.0 - Honest Ratio, with neutral agents counted by the style bincount
+        distance, _ = NashMetrics.calculate_distance_and_distribution(agents)
+        return distance
+    
+    @staticmethod
+    def calculate_distance_and_distribution(agents: List['BaseWorker']) -> Tuple[float, np.ndarray]:
+        """
+        Calculate the Nash Equilibrium Distance and the style counts in one pass over the agents.
         
-        # Calculate Honest Ratio
-        total_agents = len(agents)
-        honest_ratio = neutral_count / total_agents
+        Args:
+            agents: List of BaseWorker agents
+            
+        Returns:
+            Tuple of (distance, counts ordered as STYLES)
+        """
+        counts = NashMetrics.get_style_counts(agents)
+        if not agents:
+            return 0.0, counts
         
-        # Nash Distance = 1.0 - Honest Ratio
-        distance = 1.0 - honest_ratio
+        distance = 1.0 - counts[STYLE_INDEX["neutral"]] / len(agents)
+        return float(distance), counts
+    
+    @staticmethod
+    def get_style_counts(agents: List['BaseWorker']) -> np.ndarray:
+        """
+        Count agents per style with a single bincount over their style ids.
         
-        return distance
+        Args:
+            agents: List of BaseWorker agents
+            
+        Returns:
+            Array of counts ordered as STYLES (neutral, snake_case, camel_case);
+            agents with a style outside STYLES are not counted
+        """
+        style_ids = np.fromiter((agent.style_index for agent in agents), dtype=np.int8, count=len(agents))
+        # Unknown styles carry id -1: shift into bin 0 and drop that bin
+        return np.bincount(style_ids + 1, minlength=len(STYLES) + 1)[1:]
     
     @staticmethod
     def get_style_distribution(agents: List['BaseWorker']) -> dict:
@@ -58,18 +85,15 @@ class NashMetrics:
         Returns:
             Dictionary with counts for each style
         """
-        distribution = {
-            "neutral": 0,
-            "snake_case": 0,
-            "camel_case": 0
-        }
+        counts = NashMetrics.get_style_counts(agents)
+        distribution = dict(zip(STYLES, counts.tolist()))
         
-        for agent in agents:
-            style = agent.preferred_style
-            if style in distribution:
-                distribution[style] += 1
-            else:
-                distribution[style] = 1
+        # Any style outside STYLES gets its own key, counted by name
+        if counts.sum() < len(agents):
+            for agent in agents:
+                if agent.style_index < 0:
+                    style = agent.preferred_style
+                    distribution[style] = distribution.get(style, 0) + 1
         
         return distribution
     
@@ -84,11 +108,13 @@ class NashMetrics:
         Returns:
             Dictionary with distance, ratio, and distribution
         """
+        # One style count serves the distance and both ratios
         distribution = NashMetrics.get_style_distribution(agents)
         total = len(agents) if agents else 1
+        distance = 1.0 - distribution["neutral"] / len(agents) if agents else 0.0
         
         return {
-            "nash_distance": NashMetrics.calculate_distance(agents),
+            "nash_distance": distance,
             "honest_ratio": distribution["neutral"] / total,
             "corruption_ratio": 1.0 - (distribution["neutral"] / total),
             "distribution": distribution,